@@ -1,10 +1,13 @@
 import sys
 import os
+import asyncio
+import tempfile
 import uvicorn
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 
 # Add project root to path
@@ -16,84 +19,236 @@ from backend.logger import get_logger, init_logger
 init_logger()
 
 from backend.storage_service import ensure_minio_running
+from backend.storage_service.minio_service import ensure_bucket_exists
 from backend.database.reset_db import reset_database
 from backend.storage_service.reset_minio import reset_minio
 from backend.database.set_default import set_default
 from backend.api import auth, dashboard, emails, tasks, teachers, templates, aggregations, settings, mailbox, files, agent
 from backend.scheduler import start_scheduler, stop_scheduler
+from backend.database.db_config import (
+    get_shared_engine, test_connection, ensure_database_exists, get_pool_limits, DB_POOL_WARMUP
+)
+from backend.agent_service.intent_classifier import get_intent_classifier
+from backend.agent_service.response_cache import clear_response_cache
 
 logger = get_logger(__name__)
 
+# Set by main() for its workers: the scheduler already runs in the parent process
+SCHEDULER_IN_PARENT_ENV = "MAILMERGE_SCHEDULER_IN_PARENT"
+
+
+def scheduler_enabled_in_worker() -> bool:
+    """RUN_SCHEDULER=1 makes lifespan start the scheduler (for `uvicorn app:app` / gunicorn)."""
+    return os.getenv("RUN_SCHEDULER", "").lower() in ("1", "true", "yes")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for FastAPI app.
-    Handles startup and shutdown events.
+    Runs once per worker process, so only per-worker state belongs here.
+    The background scheduler is started by the parent process in main(); when the app
+    is served some other way it runs here only with RUN_SCHEDULER=1, which should be
+    set for a single worker or a single instance only.
     """
-    # Startup: Start the background scheduler
-    start_scheduler()
+    # Prime the connection pool so the first requests skip the TCP/auth handshake
+    await warm_up_db_pool()
+    # Load the local intent model (if configured) before serving the first query
+    await asyncio.to_thread(get_intent_classifier)
+    run_scheduler = scheduler_enabled_in_worker()
+    if run_scheduler:
+        start_scheduler()
+    elif os.getenv(SCHEDULER_IN_PARENT_ENV) != "1":
+        logger.warning(
+            "Background scheduler is not running (tasks are not checked and emails are not fetched). "
+            "Start the server with `python app.py`, or set RUN_SCHEDULER=1 for exactly one worker."
+        )
     yield
-    # Shutdown: Stop the background scheduler
-    stop_scheduler()
+    if run_scheduler:
+        stop_scheduler()
+    get_shared_engine().dispose()
 
-def main():
-    separator = "=" * 60
-    
-    # 0. Check Services (PostgreSQL & MinIO)
-    print(separator)
-    print("🔧 Checking Services Status...\n")
-    try:
-        # Check MinIO
-        ensure_minio_running()
-        logger.info("MinIO service is running.")
-        
-        # Check PostgreSQL
-        from backend.database.db_config import test_connection
-        success, msg = test_connection()
-        if success:
-            logger.info("PostgreSQL service is running.")
+
+async def warm_up_db_pool():
+    """Open DB_POOL_WARMUP pooled connections concurrently, then return them to the pool."""
+    engine = get_shared_engine()
+    count = min(DB_POOL_WARMUP, get_pool_limits()[0])
+    if count <= 0:
+        return
+    conns = await asyncio.gather(
+        *(asyncio.to_thread(engine.connect) for _ in range(count)),
+        return_exceptions=True
+    )
+    failures = 0
+    for conn in conns:
+        if isinstance(conn, BaseException):
+            failures += 1
         else:
-            raise Exception(f"PostgreSQL check failed: {msg}")
-            
-    except Exception as e:
-        logger.error(f"Service check failed: {e}")
+            conn.close()
+    if failures:
+        logger.warning(f"Database pool warm-up: {failures}/{count} connections failed")
+
+
+def create_app() -> FastAPI:
+    """Create the FastAPI app with all routers and the frontend mounted."""
+    app = FastAPI(
+        title="EduDataAggregator System API",
+        lifespan=lifespan,
+        # orjson serializes large table payloads much faster than the stdlib json
+        default_response_class=ORJSONResponse,
+    )
+
+    # CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include Routers
+    app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
+    app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+    app.include_router(emails.router, prefix="/api/emails", tags=["Emails"])
+    app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
+    app.include_router(teachers.router, prefix="/api/teachers", tags=["Teachers"])
+    app.include_router(templates.router, prefix="/api/templates", tags=["Templates"])
+    app.include_router(aggregations.router, prefix="/api/aggregations", tags=["Aggregations"])
+    app.include_router(settings.router, prefix="/api/settings", tags=["Settings"])
+    app.include_router(mailbox.router, prefix="/api/mailbox", tags=["Mailbox"])
+    app.include_router(files.router, prefix="/api/files", tags=["Files"])
+    app.include_router(agent.router, prefix="/api/agent", tags=["Agent"])
+
+    # Mount Frontend
+    frontend_path = os.path.join(os.path.dirname(__file__), "frontend")
+    if os.path.exists(frontend_path):
+        app.mount("/frontend", StaticFiles(directory=frontend_path, html=True), name="frontend")
+
+        @app.get("/")
+        async def root():
+            return RedirectResponse(url="/frontend/index.html")
+    else:
+        logger.warning("Frontend directory not found.")
+
+    return app
+
+
+# Module-level app so that each Uvicorn worker can import it as "app:app"
+app = create_app()
+
+
+def get_worker_count() -> int:
+    """Number of Uvicorn workers, overridable via WEB_CONCURRENCY."""
+    web_concurrency = os.getenv("WEB_CONCURRENCY")
+    if web_concurrency:
+        return max(int(web_concurrency), 1)
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+SEPARATOR = "=" * 60
+
+# Written once the database and bucket are known to exist; later starts skip that check
+READY_MARKER = Path(os.getenv("READY_MARKER", os.path.join(tempfile.gettempdir(), "mailmerge.ready")))
+
+
+def banner(title: str):
+    """Write a phase header in a single stdout write."""
+    sys.stdout.write(f"{SEPARATOR}\n{title}\n\n")
+    sys.stdout.flush()
+
+
+def banner_end():
+    sys.stdout.write(f"{SEPARATOR}\n\n")
+    sys.stdout.flush()
+
+
+def check_minio():
+    ensure_minio_running()
+    logger.info("MinIO service is running.")
+
+
+def check_postgres():
+    success, msg = test_connection()
+    if not success:
+        raise Exception(f"PostgreSQL check failed: {msg}")
+    logger.info("PostgreSQL service is running.")
+
+
+async def run_checks_concurrently(checks) -> list:
+    """Run blocking checks in threads at the same time; return 'name: error' for each failure."""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(check) for check in checks),
+        return_exceptions=True
+    )
+    return [
+        f"{check.__name__}: {result}"
+        for check, result in zip(checks, results)
+        if isinstance(result, BaseException)
+    ]
+
+
+async def startup_checks():
+    """Verify PostgreSQL/MinIO are reachable and the database and bucket exist; exit on failure."""
+    # 0. Check Services (PostgreSQL & MinIO)
+    banner("🔧 Checking Services Status...")
+    failures = await run_checks_concurrently([check_minio, check_postgres])
+    if failures:
+        logger.error(f"Service check failed: {'; '.join(failures)}")
         sys.exit(1)
-    print(separator + "\n")
+    banner_end()
 
-    # 1. Check Resources (Database & Bucket)
-    print(separator)
-    print("🔍 Checking Resources Existence...\n")
-    try:
-        from backend.storage_service.minio_service import ensure_bucket_exists
-        from backend.database.db_config import ensure_database_exists
-        
-        ensure_bucket_exists()
-        ensure_database_exists()
-        logger.info("Resources checked.")
-    except Exception as e:
-        logger.error(f"Resource check failed: {e}")
+    # 1. Check Resources (Database & Bucket) - needs the services from step 0
+    force_check = "--force-check" in sys.argv or "--reset" in sys.argv
+    if READY_MARKER.exists() and not force_check:
+        logger.info(f"Resources already verified ({READY_MARKER}); use --force-check to re-check.")
+        return
+
+    banner("🔍 Checking Resources Existence...")
+    failures = await run_checks_concurrently([ensure_bucket_exists, ensure_database_exists])
+    if failures:
+        logger.error(f"Resource check failed: {'; '.join(failures)}")
         sys.exit(1)
-    print(separator + "\n")
+    logger.info("Resources checked.")
+    try:
+        READY_MARKER.touch()
+    except OSError as e:
+        logger.warning(f"Could not write ready marker {READY_MARKER}: {e}")
+    banner_end()
+
+
+def main():
+    # Export the worker count before the first session creates the pooled engine (imports only
+    # build lazy session factories), so the parent and every worker size their pools from the
+    # same DB_MAX_CONNECTIONS split (see get_pool_limits)
+    os.environ["WEB_CONCURRENCY"] = str(get_worker_count())
+
+    # Service/resource checks run once here in the parent process, never in the workers.
+    # Set SKIP_STARTUP_CHECKS=1 to skip them when the services are known to be up.
+    if os.getenv("SKIP_STARTUP_CHECKS", "").lower() in ("1", "true", "yes"):
+        logger.info("Skipping service and resource checks (SKIP_STARTUP_CHECKS is set).")
+    else:
+        asyncio.run(startup_checks())
 
     # 2. Reset Database & Storage (if --reset)
     if "--reset" in sys.argv:
-        print(separator)
-        print("🔄 Resetting Database & Storage...\n")
+        banner("🔄 Resetting Database & Storage...")
         try:
             # Skip checks since we already performed them in Step 0
             reset_database()
             reset_minio()
+            # Cached SQL refers to the old schema/data; drop it with them
+            clear_response_cache()
             logger.info("Database and storage reset complete.")
         except Exception as e:
             logger.error(f"Error resetting database: {e}")
             sys.exit(1)
-        print(separator + "\n")
+        banner_end()
 
     # 3. Set Default Data (if --set-default AND --reset)
     if "--set-default" in sys.argv:
         if "--reset" in sys.argv:
-            print(separator)
-            print("📥 Inserting Default Data...\n")
+            banner("📥 Inserting Default Data...")
             try:
                 # No need to ensure_minio_running again as we checked in Step 0
                 set_default()
@@ -101,62 +256,33 @@ def main():
             except Exception as e:
                 logger.error(f"Error inserting default data: {e}")
                 sys.exit(1)
-            print(separator + "\n")
+            banner_end()
         else:
             logger.warning("Skipping --set-default: It requires --reset to be set.")
-            print(separator + "\n")
+            banner_end()
 
-    # 4. Initialize Application
-    print(separator)
-    print("🚀 Initializing Application...\n")
+    # 4. Run Server
+    workers = int(os.environ["WEB_CONCURRENCY"])
+    banner(f"🚀 Starting server on http://localhost:8000 ({workers} workers)")
+    # The scheduler runs once in this parent process, not in every worker
+    os.environ[SCHEDULER_IN_PARENT_ENV] = "1"
+    os.environ["RUN_SCHEDULER"] = "0"
+    start_scheduler()
     try:
-        # Create FastAPI app
-        app = FastAPI(title="EduDataAggregator System API", lifespan=lifespan)
-
-        # CORS
-        app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
+        uvicorn.run(
+            "app:app",
+            host="0.0.0.0",
+            port=8000,
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
+            workers=workers,
+            log_level="warning",
+            # Per-request access lines are costly; enable with ACCESS_LOG=1
+            access_log=os.getenv("ACCESS_LOG", "0").lower() in ("1", "true", "yes")
         )
-
-        # Include Routers
-        app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
-        app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
-        app.include_router(emails.router, prefix="/api/emails", tags=["Emails"])
-        app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
-        app.include_router(teachers.router, prefix="/api/teachers", tags=["Teachers"])
-        app.include_router(templates.router, prefix="/api/templates", tags=["Templates"])
-        app.include_router(aggregations.router, prefix="/api/aggregations", tags=["Aggregations"])
-        app.include_router(settings.router, prefix="/api/settings", tags=["Settings"])
-        app.include_router(mailbox.router, prefix="/api/mailbox", tags=["Mailbox"])
-        app.include_router(files.router, prefix="/api/files", tags=["Files"])
-        app.include_router(agent.router, prefix="/api/agent", tags=["Agent"])
-
-        # Mount Frontend
-        frontend_path = os.path.join(os.path.dirname(__file__), "frontend")
-        if os.path.exists(frontend_path):
-            app.mount("/frontend", StaticFiles(directory=frontend_path, html=True), name="frontend")
-            
-            @app.get("/")
-            async def root():
-                return RedirectResponse(url="/frontend/index.html")
-        else:
-            logger.warning("Frontend directory not found.")
-            
-        logger.info("Application initialized successfully.")
-    except Exception as e:
-        logger.error(f"Application initialization failed: {e}")
-        sys.exit(1)
-    print(separator + "\n")
-
-    # 5. Run Server
-    print(separator)
-    print("🚀 Starting server on http://localhost:8000\n")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-    print(separator + "\n")
+    finally:
+        stop_scheduler()
+    banner_end()
 
 if __name__ == "__main__":
     main()
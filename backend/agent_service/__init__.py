@@ -1,12 +1,13 @@
 """
 Agent Service - 统一导出接口
 """
-from .agent_service import process_user_query
+from .agent_service import process_user_query, reload_config
 from .config import Config
 from .action_router import ActionType
 
 __all__ = [
     "process_user_query",  # 主入口函数
+    "reload_config",       # 重新加载配置
     "Config",              # 配置类
     "ActionType"           # ACTION类型枚举
 ]
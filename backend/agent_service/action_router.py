@@ -2,9 +2,14 @@
 Action Router - ACTION识别器
 负责识别用户自然语言的意图，返回对应的ACTION类型
 """
+import asyncio
+import re
+from collections import OrderedDict
 from enum import Enum
+from typing import List, Optional, Set, Tuple
 
-from .llm_client import LLMClient
+from .intent_classifier import get_intent_classifier
+from .llm_client import LLMClient, get_llm_client
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,17 +24,203 @@ class ActionType(Enum):
     UNKNOWN = "UNKNOWN"                # 未知/无法识别
 
 
+# LLM返回的类型名称 -> ActionType（一次哈希查找完成分类）
+_ACTION_MAP = {
+    "SQL_QUERY": ActionType.SQL_QUERY,
+    "SQL": ActionType.SQL_QUERY,
+    "CREATE_TEMPLATE": ActionType.CREATE_TEMPLATE,
+    "TEMPLATE": ActionType.CREATE_TEMPLATE,
+    "SEND_EMAIL": ActionType.SEND_EMAIL,
+    "EMAIL": ActionType.SEND_EMAIL,
+    "SEND MAIL": ActionType.SEND_EMAIL,
+    "CREATE_TASK": ActionType.CREATE_TASK,
+    "TASK": ActionType.CREATE_TASK,
+    "UNKNOWN": ActionType.UNKNOWN,
+}
+
+# 回答不止一个词时（如带有解释文字），用单个正则定位类型名称
+_ACTION_RE = re.compile(
+    r"\b(SQL_QUERY|SQL|CREATE_TEMPLATE|TEMPLATE|SEND_EMAIL|SEND MAIL|EMAIL|CREATE_TASK|TASK|UNKNOWN)\b"
+)
+
+
+# 意图类型说明（单条与批量识别共用）
+_ACTION_TYPES_DOC = """支持的操作类型：
+1. `SQL_QUERY`: 用户想要查询数据库信息（查询、统计、列出、显示等）
+2. `CREATE_TEMPLATE`: 用户想要创建数据收集模板（创建模板、生成表单、设计模板等）
+3. `SEND_EMAIL`: 用户想要发送邮件（发送邮件、发信、通知某人等）
+4. `CREATE_TASK`: 用户想要创建数据收集任务（发布任务、发起收集、创建任务等）
+5. `UNKNOWN`: 无法识别的请求"""
+
+# 单条识别的系统提示词
+_ROUTE_PROMPT = f"""你是一个意图识别助手，负责识别用户输入属于哪种操作类型。
+
+{_ACTION_TYPES_DOC}
+
+请根据用户输入返回对应的操作类型。只返回类型名称，不要有其他内容。"""
+
+# 批量识别的系统提示词
+_BATCH_ROUTE_PROMPT = f"""你是一个意图识别助手，负责分别识别多条用户输入属于哪种操作类型。
+
+{_ACTION_TYPES_DOC}
+
+用户输入按编号逐行给出。请为每条输入返回一行"编号. 类型名称"，不要有其他内容。"""
+
+# 批量回复中的一行："3. SQL_QUERY"
+_NUMBERED_LINE_RE = re.compile(r"^\s*(\d+)\s*[.、:：)）]\s*(.*)$")
+
+# 微批参数：最多合并的请求数，以及首个请求到达后的最长等待时间
+MAX_BATCH = 16
+MAX_WAIT_MS = 10
+
+# 识别结果缓存的最大条目数
+ROUTE_CACHE_SIZE = 4096
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(user_input: str) -> str:
+    """生成缓存键：去除首尾空白、统一小写并合并连续空白"""
+    return _WHITESPACE_RE.sub(" ", user_input.strip().lower())[:256]
+
+
+def _parse_action(result: str) -> ActionType:
+    """将LLM返回的（已大写的）文本解析为ActionType"""
+    if not result:
+        return ActionType.UNKNOWN
+    token = result.split()[0].strip("`'\".,:;：。")
+    action = _ACTION_MAP.get(token)
+    if action is not None:
+        return action
+    match = _ACTION_RE.search(result)
+    return _ACTION_MAP[match.group(1)] if match else ActionType.UNKNOWN
+
+
+class RouterBatcher:
+    """LLM意图识别微批器
+
+    将短时间窗口（MAX_WAIT_MS）内并发到达的识别请求合并为一次LLM调用，
+    按编号解析回复后，通过每个调用方各自的Future返回结果。
+    """
+
+    def __init__(self, llm_client: LLMClient, max_batch: int = MAX_BATCH, max_wait_ms: int = MAX_WAIT_MS):
+        self.llm_client = llm_client
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, user_input: str) -> ActionType:
+        """提交一条用户输入，等待所在批次的识别结果"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((user_input, future))
+        return await future
+
+    async def _collect(self):
+        """后台任务：攒批后派发，派发不阻塞下一批的收集"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """识别一批输入并回填各自的Future"""
+        texts = [text for text, _ in batch]
+        try:
+            if len(texts) == 1:
+                actions = [await self._classify_one(texts[0])]
+            else:
+                actions = await self._classify_many(texts)
+        except Exception as e:
+            logger.error("ACTION识别失败: %s", e)
+            actions = [ActionType.UNKNOWN] * len(batch)
+
+        for (_, future), action in zip(batch, actions):
+            if not future.done():
+                future.set_result(action)
+
+    async def _classify_one(self, user_input: str) -> ActionType:
+        response = await self.llm_client.achat(
+            system_prompt=_ROUTE_PROMPT,
+            user_message=user_input,
+            temperature=0.1
+        )
+        # LLMClient 返回的是字典，content 字段包含回复内容
+        result = response.get("content", "").strip().upper()
+        logger.info("ACTION识别结果: %s", result)
+        return _parse_action(result)
+
+    async def _classify_many(self, texts: List[str]) -> List[ActionType]:
+        # 每条输入压成一行，保证编号与行一一对应
+        user_message = "\n".join(
+            f"{i}. {' '.join(text.split())}" for i, text in enumerate(texts, 1)
+        )
+        response = await self.llm_client.achat(
+            system_prompt=_BATCH_ROUTE_PROMPT,
+            user_message=user_message,
+            temperature=0.1
+        )
+        result = response.get("content", "").strip().upper()
+        logger.info("ACTION批量识别结果(%d条): %s", len(texts), result)
+
+        actions: List[Optional[ActionType]] = [None] * len(texts)
+        for line in result.splitlines():
+            match = _NUMBERED_LINE_RE.match(line)
+            if not match:
+                continue
+            index = int(match.group(1)) - 1
+            if 0 <= index < len(texts) and actions[index] is None:
+                actions[index] = _parse_action(match.group(2))
+
+        # 回复中缺失的编号逐条补识别
+        missing = [i for i, action in enumerate(actions) if action is None]
+        if missing:
+            retried = await asyncio.gather(
+                *(self._classify_one(texts[i]) for i in missing),
+                return_exceptions=True
+            )
+            for i, action in zip(missing, retried):
+                actions[i] = ActionType.UNKNOWN if isinstance(action, BaseException) else action
+        return actions
+
+
 class ActionRouter:
     """ACTION识别路由器
     
-    使用LLM识别用户意图，返回对应的ACTION类型
+    优先使用本地向量模型识别用户意图，置信度不足时再调用LLM识别
+    （并发的LLM识别请求经RouterBatcher合并）
     """
     
     def __init__(self):
-        # LLMClient 内部会自动加载环境变量配置
-        self.llm_client = LLMClient()
+        # 与各ACTION处理器共享同一个LLMClient（及其连接池）
+        self.llm_client = get_llm_client()
+        self.batcher = RouterBatcher(self.llm_client)
+        # 归一化输入 -> ActionType 的LRU缓存（同一输入的识别结果不变）
+        self._cache: "OrderedDict[str, ActionType]" = OrderedDict()
+
+    def clear_cache(self):
+        """清空识别结果缓存（配置重新加载后调用）"""
+        self._cache.clear()
     
-    def route(self, user_input: str) -> ActionType:
+    async def route(self, user_input: str) -> ActionType:
         """识别用户输入的意图，返回ACTION类型
         
         Args:
@@ -38,42 +229,34 @@ class ActionRouter:
         Returns:
             ActionType枚举值
         """
-        # 系统提示词：专门用于识别ACTION
-        system_prompt = """你是一个意图识别助手，负责识别用户输入属于哪种操作类型。
+        key = _normalize(user_input)
+        action = self._cache.get(key)
+        if action is not None:
+            self._cache.move_to_end(key)
+            return action
 
-支持的操作类型：
-1. `SQL_QUERY`: 用户想要查询数据库信息（查询、统计、列出、显示等）
-2. `CREATE_TEMPLATE`: 用户想要创建数据收集模板（创建模板、生成表单、设计模板等）
-3. `SEND_EMAIL`: 用户想要发送邮件（发送邮件、发信、通知某人等）
-4. `CREATE_TASK`: 用户想要创建数据收集任务（发布任务、发起收集、创建任务等）
-5. `UNKNOWN`: 无法识别的请求
+        action = await self._route(user_input)
+        # UNKNOWN 可能来自临时故障，不缓存
+        if action is not ActionType.UNKNOWN:
+            self._cache[key] = action
+            if len(self._cache) > ROUTE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return action
 
-请根据用户输入返回对应的操作类型。只返回类型名称，不要有其他内容。"""
+    async def _route(self, user_input: str) -> ActionType:
+        """未命中缓存时的实际识别：本地模型优先，LLM兜底"""
+        classifier = get_intent_classifier()
+        if classifier is not None:
+            try:
+                label = await asyncio.to_thread(classifier.classify, user_input)
+                if label is not None:
+                    logger.info("ACTION本地识别结果: %s", label)
+                    return ActionType(label)
+            except Exception as e:
+                logger.error("ACTION本地识别失败，改用LLM识别: %s", e)
 
         try:
-            response = self.llm_client.chat(
-                system_prompt=system_prompt,
-                user_message=user_input,
-                temperature=0.1
-            )
-            
-            # LLMClient.chat 返回的是字典，content 字段包含回复内容
-            result = response.get("content", "").strip().upper()
-            
-            logger.info(f"ACTION识别的自然语言结果: {result}")
-            
-            # 解析返回结果
-            if "SQL_QUERY" in result or "SQL" in result:
-                return ActionType.SQL_QUERY
-            elif "CREATE_TEMPLATE" in result or "TEMPLATE" in result:
-                return ActionType.CREATE_TEMPLATE
-            elif "SEND_EMAIL" in result or "EMAIL" in result or "SEND MAIL" in result:
-                return ActionType.SEND_EMAIL
-            elif "CREATE_TASK" in result or "TASK" in result:
-                return ActionType.CREATE_TASK
-            else:
-                return ActionType.UNKNOWN
-                
+            return await self.batcher.submit(user_input)
         except Exception as e:
-            logger.error(f"ACTION识别失败: {e}")
+            logger.error("ACTION识别失败: %s", e)
             return ActionType.UNKNOWN
@@ -2,24 +2,78 @@
 Agent Service - 统一入口
 提供外部调用的标准接口，负责调度各个ACTION子目录
 """
+import importlib
+import sys
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 
 from .config import Config
 from .action_router import ActionRouter, ActionType
-from .llm_client import LLMClient
+from .intent_classifier import get_intent_classifier
+from .llm_client import get_llm_client
+from .response_cache import get_response_cache
 from .schemas import AgentResponse, AgentResponseItem
 from backend.logger import get_logger
 
-# 导入各个ACTION子目录的入口函数
-from .sql_query.handler import handle_sql_query
-from .create_template.handler import handle_create_template
-from .send_email.handler import handle_send_email
-from .create_task.handler import handle_create_task
-
 logger = get_logger(__name__)
 
+# 固定内容的响应在导入时构造一次，按引用返回（调用方只做序列化，不会修改）
+_UNKNOWN_RESPONSE = AgentResponse(items=[
+    AgentResponseItem(format="text", content="抱歉，我无法理解您的请求。请尝试更明确地描述您的需求，例如：\n- '查询所有院系的名称'\n- '创建一个收集学生信息的模板'")
+])
+
+# 智能助手未开启时的提示，附带表格展示功能的测试样例
+_DISABLED_RESPONSE = AgentResponse(items=[
+    AgentResponseItem(format="text", content="抱歉，智能助手功能当前未开启。请联系管理员启用该功能。\n\n以下是表格展示功能的测试样例："),
+    AgentResponseItem(format="table", content={
+        "columns": ["姓名", "工号", "院系", "职称", "邮箱", "入职日期", "状态"],
+        "rows": [
+            ["张三", "T2023001", "计算机学院", "教授", "zhangsan@example.com", "2020-01-01", "在职"],
+            ["李四", "T2023002", "数学学院", "副教授", "lisi@example.com", "2021-03-15", "在职"],
+            ["王五", "T2023003", "物理学院", "讲师", "wangwu@example.com", "2022-07-01", "在职"],
+            ["赵六", "T2023004", "化学学院", "助教", "zhaoliu@example.com", "2023-09-01", "实习"],
+            ["钱七", "T2023005", "外国语学院", "教授", "qianqi@example.com", "2019-11-11", "休假"]
+        ]
+    })
+])
+
+# 各ACTION子目录的入口函数：ActionType -> (模块, 函数名)
+# 首次用到时才导入，缩短每个Uvicorn worker的启动时间
+_HANDLERS = {
+    ActionType.SQL_QUERY: (".sql_query.handler", "handle_sql_query"),
+    ActionType.CREATE_TEMPLATE: (".create_template.handler", "handle_create_template"),
+    ActionType.SEND_EMAIL: (".send_email.handler", "handle_send_email"),
+    ActionType.CREATE_TASK: (".create_task.handler", "handle_create_task"),
+}
+
+
+@lru_cache(maxsize=None)
+def _get_handler(action: ActionType):
+    """按需导入并缓存ACTION的处理函数"""
+    module_name, func_name = _HANDLERS[action]
+    return getattr(importlib.import_module(module_name, __package__), func_name)
+
+
+@lru_cache(maxsize=1)
+def _get_router() -> ActionRouter:
+    """进程内复用的ACTION识别器（复用其LLM客户端的HTTP连接）"""
+    return ActionRouter()
+
 
-def process_user_query(
+def reload_config():
+    """重新加载环境变量配置：清除配置缓存及依赖配置创建的共享对象"""
+    Config.from_env.cache_clear()
+    get_intent_classifier.cache_clear()
+    get_llm_client.cache_clear()
+    _get_router.cache_clear()
+    get_response_cache.cache_clear()
+    # handler模块按需导入，仅在已加载时清除其缓存
+    send_email_handler = sys.modules.get(f"{__package__}.send_email.handler")
+    if send_email_handler is not None:
+        send_email_handler.get_smtp_rate_limiter.cache_clear()
+
+
+async def process_user_query(
     user_input: str,
     user_id: Optional[int] = None
 ) -> AgentResponse:
@@ -43,23 +97,7 @@ def process_user_query(
     
     # 检查是否启用
     if not cfg.ENABLED:
-        # 构造测试表格数据
-        test_columns = ["姓名", "工号", "院系", "职称", "邮箱", "入职日期", "状态"]
-        test_rows = [
-            ["张三", "T2023001", "计算机学院", "教授", "zhangsan@example.com", "2020-01-01", "在职"],
-            ["李四", "T2023002", "数学学院", "副教授", "lisi@example.com", "2021-03-15", "在职"],
-            ["王五", "T2023003", "物理学院", "讲师", "wangwu@example.com", "2022-07-01", "在职"],
-            ["赵六", "T2023004", "化学学院", "助教", "zhaoliu@example.com", "2023-09-01", "实习"],
-            ["钱七", "T2023005", "外国语学院", "教授", "qianqi@example.com", "2019-11-11", "休假"]
-        ]
-        
-        return AgentResponse(items=[
-            AgentResponseItem(format="text", content="抱歉，智能助手功能当前未开启。请联系管理员启用该功能。\n\n以下是表格展示功能的测试样例："),
-            AgentResponseItem(format="table", content={
-                "columns": test_columns,
-                "rows": test_rows
-            })
-        ])
+        return _DISABLED_RESPONSE
     
     logger.info("=" * 50)
     logger.info(f"收到新的用户请求 [User ID: {user_id}]")
@@ -67,8 +105,8 @@ def process_user_query(
     
     # 第一步：识别ACTION
     logger.info("正在识别用户意图...")
-    router = ActionRouter()
-    action = router.route(user_input)
+    router = _get_router()
+    action = await router.route(user_input)
     
     logger.info(f"识别到ACTION: {action.value}")
     
@@ -76,33 +114,31 @@ def process_user_query(
     try:
         if action == ActionType.SQL_QUERY:
             logger.info("开始处理 SQL_QUERY 请求...")
-            result = handle_sql_query(user_input, user_id=user_id)
+            result = await _get_handler(action)(user_input, user_id=user_id)
             logger.info("SQL_QUERY 请求处理完成")
             return _format_sql_query_result(result)
         
         elif action == ActionType.CREATE_TEMPLATE:
             logger.info("开始处理 CREATE_TEMPLATE 请求...")
-            result = handle_create_template(user_input, user_id=user_id)
+            result = await _get_handler(action)(user_input, user_id=user_id)
             logger.info("CREATE_TEMPLATE 请求处理完成")
             return _format_create_template_result(result)
 
         elif action == ActionType.SEND_EMAIL:
             logger.info("开始处理 SEND_EMAIL 请求...")
-            result = handle_send_email(user_input, user_id=user_id)
+            result = await _get_handler(action)(user_input, user_id=user_id)
             logger.info("SEND_EMAIL 请求处理完成")
             return _format_send_email_result(result)
 
         elif action == ActionType.CREATE_TASK:
             logger.info("开始处理 CREATE_TASK 请求...")
-            result = handle_create_task(user_input, user_id=user_id)
+            result = await _get_handler(action)(user_input, user_id=user_id)
             logger.info("CREATE_TASK 请求处理完成")
             return _format_create_task_result(result)
         
         else:  # ActionType.UNKNOWN
             logger.warning("无法识别用户意图")
-            return AgentResponse(items=[
-                AgentResponseItem(format="text", content="抱歉，我无法理解您的请求。请尝试更明确地描述您的需求，例如：\n- '查询所有院系的名称'\n- '创建一个收集学生信息的模板'")
-            ])
+            return _UNKNOWN_RESPONSE
     
     except Exception as e:
         logger.error(f"处理请求时发生错误: {e}", exc_info=True)
@@ -144,19 +180,12 @@ def _format_sql_query_result(result: Dict[str, Any]) -> AgentResponse:
         # 3. 数据表格（如果有数据）
         if row_count > 0:
             columns = data.get("columns", [])
-            # 转换 rows 为字典列表（如果它们是元组或列表）
-            # 假设 rows 是 list of tuples/lists，需要转为 list of dicts 以便前端更好处理，或者前端处理 list of lists
-            # 这里为了通用性，我们保持 rows 为 list of lists/tuples，但在 content 中明确结构
-            
-            # 注意：SQLAlchemy 的 result.fetchall() 返回的是 Row 对象，可以像 tuple 一样索引
-            # 为了 JSON 序列化，我们需要将其转换为 list
-            serialized_rows = [list(row) for row in rows]
-            
+            # SQLExecutor 已将 Row 转为 tuple（可直接JSON序列化为数组），这里无需再逐行复制
             items.append(AgentResponseItem(
                 format="table",
                 content={
                     "columns": columns,
-                    "rows": serialized_rows
+                    "rows": rows
                 }
             ))
             
@@ -4,6 +4,8 @@
 数据库配置统一使用 backend.database.db_config
 """
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 
 try:
@@ -13,34 +15,57 @@ except ImportError:
     pass  # 如果没有安装dotenv，直接使用环境变量
 
 
+@dataclass(frozen=True)
 class Config:
-    """LLM配置类（数据库配置使用backend.database.db_config）"""
-    
-    def __init__(
-        self,
-        API_KEY: Optional[str] = None,
-        BASE_URL: Optional[str] = None,
-        MODEL_NAME: Optional[str] = None,
-        MAX_RETRY: Optional[int] = None,
-        TIMEOUT: Optional[int] = None,
-        ENABLED: bool = True
-    ):
-        # LLM配置
-        self.API_KEY = API_KEY
-        self.BASE_URL = BASE_URL
-        self.MODEL_NAME = MODEL_NAME
-        self.MAX_RETRY = MAX_RETRY or 3
-        self.TIMEOUT = TIMEOUT or 60
-        self.ENABLED = ENABLED
-    
+    """LLM配置类（数据库配置使用backend.database.db_config）
+
+    不可变对象：from_env() 的结果在进程内缓存共享，
+    重新加载配置时调用 Config.from_env.cache_clear()
+    """
+
+    # LLM配置
+    API_KEY: Optional[str] = field(default=None, repr=False)  # 不出现在日志/repr中
+    BASE_URL: Optional[str] = None
+    MODEL_NAME: Optional[str] = None
+    MAX_RETRY: Optional[int] = None
+    TIMEOUT: Optional[int] = None
+    ENABLED: bool = True
+    # 本地意图识别模型（为空时仅使用LLM识别意图）
+    INTENT_MODEL_DIR: Optional[str] = None
+    INTENT_THRESHOLD: Optional[float] = None
+    # 整个服务的限流（每秒请求数，<=0 表示不限流），各Worker按 WEB_CONCURRENCY 均分；略低于服务商配额以吸收突发
+    LLM_RPS: float = 0
+    SMTP_RPS: float = 0
+    # 每个Worker空闲时可立即放行的次数（一次请求的几次LLM调用 / 一批邮件）
+    LLM_BURST: int = 0
+    SMTP_BURST: int = 0
+    # LLM响应持久化缓存（SQLite文件路径为空或TTL<=0时不缓存；默认关闭，路径应位于项目专属目录）
+    LLM_CACHE_PATH: Optional[str] = None
+    LLM_CACHE_TTL: int = 0
+
+    def __post_init__(self):
+        # 未指定时使用默认值（frozen dataclass 需通过 object.__setattr__ 赋值）
+        object.__setattr__(self, "MAX_RETRY", self.MAX_RETRY or 3)
+        object.__setattr__(self, "TIMEOUT", self.TIMEOUT or 60)
+        object.__setattr__(self, "INTENT_THRESHOLD", self.INTENT_THRESHOLD or 0.35)
+
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls):
-        """从环境变量加载配置"""
+        """从环境变量加载配置（结果缓存，进程内只解析一次）"""
         return cls(
             API_KEY=os.getenv("DASHSCOPE_API_KEY"),
             BASE_URL=os.getenv("BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
             MODEL_NAME=os.getenv("MODEL_NAME", "qwen-plus"),
             MAX_RETRY=int(os.getenv("MAX_RETRY", "3")),
             TIMEOUT=int(os.getenv("LLM_TIMEOUT", "60")),
-            ENABLED=os.getenv("LLM_ENABLED", "true").lower() == "true"
+            ENABLED=os.getenv("LLM_ENABLED", "true").lower() == "true",
+            INTENT_MODEL_DIR=os.getenv("INTENT_MODEL_DIR") or None,
+            INTENT_THRESHOLD=float(os.getenv("INTENT_THRESHOLD", "0.35")),
+            LLM_RPS=float(os.getenv("LLM_RPS", "10")),
+            SMTP_RPS=float(os.getenv("SMTP_RPS", "2")),
+            LLM_BURST=int(os.getenv("LLM_BURST", "3")),
+            SMTP_BURST=int(os.getenv("SMTP_BURST", "20")),
+            LLM_CACHE_PATH=os.getenv("LLM_CACHE_PATH") or None,
+            LLM_CACHE_TTL=int(os.getenv("LLM_CACHE_TTL", "86400"))
         )
@@ -1,28 +1,83 @@
 from typing import Dict, Any, List
 from datetime import datetime
 
+# create_task 工具定义（固定不变，模块加载时构造一次）
+_CREATE_TASK_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "create_task",
+            "description": "创建一个新的数据收集任务",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "任务名称"
+                    },
+                    "description": {
+                        "type": "string",
+                        "description": "任务描述"
+                    },
+                    "deadline": {
+                        "type": "string",
+                        "description": "截止时间 (ISO8601格式)"
+                    },
+                    "started_time": {
+                        "type": "string",
+                        "description": "开始时间 (ISO8601格式)"
+                    },
+                    "template_id": {
+                        "type": "integer",
+                        "description": "使用的表单模板ID"
+                    },
+                    "mail_subject": {
+                        "type": "string",
+                        "description": "通知邮件的标题"
+                    },
+                    "mail_content": {
+                        "type": "string",
+                        "description": "通知邮件的正文内容"
+                    },
+                    "teacher_ids": {
+                        "type": "array",
+                        "items": {"type": "integer"},
+                        "description": "目标教师的ID列表"
+                    }
+                },
+                "required": ["name", "template_id", "mail_subject", "mail_content", "teacher_ids"]
+            }
+        }
+    }
+]
+
+
 def generate_create_task_prompt(user_id: int, templates: List[Dict[str, Any]], teachers: List[Dict[str, Any]]) -> Dict[str, Any]:
     """生成创建任务的Prompt"""
     
     # 格式化模板列表
-    templates_str = "可用的表单模板列表：\n"
+    template_parts = ["可用的表单模板列表："]
     if not templates:
-        templates_str += "（暂无可用模板）\n"
+        template_parts.append("（暂无可用模板）")
     else:
         for t in templates:
             fields_str = ", ".join(t['fields'])
-            templates_str += f"- ID: {t['id']}, 名称: {t['name']}, 包含字段: [{fields_str}]\n"
+            template_parts.append(f"- ID: {t['id']}, 名称: {t['name']}, 包含字段: [{fields_str}]")
+    templates_str = "\n".join(template_parts) + "\n"
             
     # 格式化教师列表
-    teachers_str = "可用的教师列表：\n"
+    # 教师数量可能很大：用生成器直接交给 join，不逐条 append
     if not teachers:
-        teachers_str += "（暂无教师信息）\n"
+        teachers_str = "可用的教师列表：\n（暂无教师信息）\n"
     else:
-        for t in teachers:
-            teachers_str += f"- ID: {t['id']}, 姓名: {t['name']}, 邮箱: {t['email']}, 职称: {t['title'] or '无'}\n"
+        teachers_str = "可用的教师列表：\n" + "".join(
+            f"- ID: {t['id']}, 姓名: {t['name']}, 邮箱: {t['email']}, 职称: {t['title'] or '无'}\n"
+            for t in teachers
+        )
 
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    current_weekday = datetime.now().isoweekday()
+    now = datetime.now()
+    current_time = now.strftime("%Y-%m-%d %H:%M:%S")
+    current_weekday = now.isoweekday()
 
     system_prompt = f"""你是一个智能任务创建助手。你的目标是根据用户的自然语言描述，提取创建收集任务所需的信息。
 
@@ -52,56 +107,7 @@ def generate_create_task_prompt(user_id: int, templates: List[Dict[str, Any]], t
 - teacher_ids: 目标教师ID列表 (array of integers)
 """
 
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "create_task",
-                "description": "创建一个新的数据收集任务",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "任务名称"
-                        },
-                        "description": {
-                            "type": "string",
-                            "description": "任务描述"
-                        },
-                        "deadline": {
-                            "type": "string",
-                            "description": "截止时间 (ISO8601格式)"
-                        },
-                        "started_time": {
-                            "type": "string",
-                            "description": "开始时间 (ISO8601格式)"
-                        },
-                        "template_id": {
-                            "type": "integer",
-                            "description": "使用的表单模板ID"
-                        },
-                        "mail_subject": {
-                            "type": "string",
-                            "description": "通知邮件的标题"
-                        },
-                        "mail_content": {
-                            "type": "string",
-                            "description": "通知邮件的正文内容"
-                        },
-                        "teacher_ids": {
-                            "type": "array",
-                            "items": {"type": "integer"},
-                            "description": "目标教师的ID列表"
-                        }
-                    },
-                    "required": ["name", "template_id", "mail_subject", "mail_content", "teacher_ids"]
-                }
-            }
-        }
-    ]
-
     return {
         "system_prompt": system_prompt,
-        "tools": tools
+        "tools": _CREATE_TASK_TOOLS
     }
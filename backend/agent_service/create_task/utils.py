@@ -1,54 +1,52 @@
-from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Tuple
+from sqlalchemy.orm import Session, selectinload
 from backend.database.db_config import get_session_factory
 from backend.database.models import TemplateForm, Teacher, Secretary
 
-def fetch_available_templates(user_id: int) -> List[Dict[str, Any]]:
-    """获取当前用户可用的模板列表"""
-    SessionLocal = get_session_factory()
-    db = SessionLocal()
-    try:
-        # 获取当前秘书创建的模板
-        templates = db.query(TemplateForm).filter(
-            TemplateForm.created_by == user_id
-        ).all()
-        
-        result = []
-        for t in templates:
-            # 获取模板字段
-            fields = [f.display_name for f in t.fields]
-            result.append({
-                "id": t.id,
-                "name": t.name,
-                "fields": fields
-            })
-        return result
-    finally:
-        db.close()
+# 共享的Session工厂（绑定进程内连接池），导入时获取一次
+SessionLocal = get_session_factory()
 
-def fetch_available_teachers(user_id: int) -> List[Dict[str, Any]]:
-    """获取当前用户所在院系的教师列表"""
-    SessionLocal = get_session_factory()
+def fetch_task_context(user_id: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """在同一个Session中获取当前用户可用的模板列表和所在院系的教师列表"""
     db = SessionLocal()
     try:
-        secretary = db.query(Secretary).filter(Secretary.id == user_id).first()
-        if not secretary:
-            return []
-            
-        teachers = db.query(Teacher).filter(
-            Teacher.department_id == secretary.department_id
-        ).all()
-        
-        result = []
-        for t in teachers:
-            result.append({
-                "id": t.id,
-                "name": t.name,
-                "email": t.email,
-                "phone": t.phone,
-                "title": t.title,
-                "office": t.office
-            })
-        return result
+        return _fetch_available_templates(db, user_id), _fetch_available_teachers(db, user_id)
     finally:
         db.close()
+
+def _fetch_available_templates(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """获取当前秘书创建的模板（字段通过 selectinload 一次性加载，避免 N+1 查询）"""
+    templates = db.query(TemplateForm).options(
+        selectinload(TemplateForm.fields)
+    ).filter(
+        TemplateForm.created_by == user_id
+    ).all()
+    
+    result = []
+    for t in templates:
+        # 获取模板字段
+        fields = [f.display_name for f in t.fields]
+        result.append({
+            "id": t.id,
+            "name": t.name,
+            "fields": fields
+        })
+    return result
+
+def _fetch_available_teachers(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """获取当前秘书所在院系的教师（院系通过子查询确定，只需一次查询）
+    
+    只查询Prompt用到的列（id/name/email/title），不加载完整的ORM对象
+    """
+    department_id = db.query(Secretary.department_id).filter(
+        Secretary.id == user_id
+    ).scalar_subquery()
+    
+    rows = db.query(Teacher.id, Teacher.name, Teacher.email, Teacher.title).filter(
+        Teacher.department_id == department_id
+    ).all()
+    
+    return [
+        {"id": r.id, "name": r.name, "email": r.email, "title": r.title}
+        for r in rows
+    ]
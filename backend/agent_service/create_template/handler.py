@@ -2,19 +2,26 @@
 Create Template Handler - 创建模板ACTION的入口函数
 负责协调整个模板创建流程
 """
+import asyncio
 from typing import Dict, Any
 
 from backend.database.db_config import get_session_factory
-from backend.utils.template_utils import create_template_core
+from backend.utils.template_utils import create_template_core, ERROR_DUPLICATE_NAME, ERROR_INTERNAL
 from ..config import Config
-from ..llm_client import LLMClient
+from ..llm_client import get_llm_client, trim_retry_history
 from .prompt_generator import generate_create_template_prompt
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 重新生成模板定义也无法解决的错误：名称冲突（不应擅自改名）、数据库等内部错误
+NON_RETRYABLE_ERRORS = {ERROR_DUPLICATE_NAME, ERROR_INTERNAL}
 
-def handle_create_template(user_input: str, user_id: int = None) -> Dict[str, Any]:
+# 共享的Session工厂（绑定进程内连接池），导入时获取一次
+SessionLocal = get_session_factory()
+
+
+async def handle_create_template(user_input: str, user_id: int = None) -> Dict[str, Any]:
     """创建模板ACTION的处理入口
     
     工作流程：
@@ -48,8 +55,7 @@ def handle_create_template(user_input: str, user_id: int = None) -> Dict[str, An
     
     # 初始化组件
     config = Config.from_env()
-    llm_client = LLMClient()
-    SessionLocal = get_session_factory()
+    llm_client = get_llm_client()
     
     # 生成Prompt和工具定义
     prompt_data = generate_create_template_prompt()
@@ -63,13 +69,15 @@ def handle_create_template(user_input: str, user_id: int = None) -> Dict[str, An
         {"role": "user", "content": user_input}
     ]
     
+    attempt_start = len(conversation_history)
     for attempt in range(1, max_retries + 1):
         logger.info(f"创建模板尝试 {attempt}/{max_retries}")
+        attempt_start = trim_retry_history(conversation_history, attempt_start)
         
         try:
             # 调用LLM生成模板定义
             logger.info("正在调用 LLM 生成模板定义...")
-            llm_response = llm_client.chat_with_history(
+            llm_response = await llm_client.achat_with_history(
                 messages=conversation_history,
                 tools=tools,
                 temperature=0.1
@@ -99,43 +107,41 @@ def handle_create_template(user_input: str, user_id: int = None) -> Dict[str, An
             template_data = tool_call["arguments"]
             logger.info(f"LLM生成模板定义: {template_data}")
             
-            # 调用核心业务逻辑创建模板
-            db = SessionLocal()
-            try:
-                logger.info("正在调用核心业务逻辑创建模板...")
-                result = create_template_core(
-                    name=template_data.get("name"),
-                    fields=template_data.get("fields", []),
-                    description=template_data.get("description"),
-                    created_by=user_id,
-                    db=db
-                )
+            # 调用核心业务逻辑创建模板（同步数据库操作放入线程池）
+            logger.info("正在调用核心业务逻辑创建模板...")
+            result = await asyncio.to_thread(_create_template_in_db, template_data, user_id)
+            
+            if result["success"]:
+                logger.info(f"模板创建成功: {result}")
+                return {
+                    "status": "success",
+                    "data": {
+                        "template_id": result["data"]["template_id"],
+                        "template_name": template_data["name"],
+                        "field_count": len(template_data.get("fields", []))
+                    }
+                }
+            else:
+                error_msg = result["message"]
+                logger.warning(f"模板创建失败: {error_msg}")
                 
-                if result["success"]:
-                    logger.info(f"模板创建成功: {result}")
+                # 不可重试的错误直接返回，避免无意义的LLM调用
+                if result.get("error_code") in NON_RETRYABLE_ERRORS:
                     return {
-                        "status": "success",
-                        "data": {
-                            "template_id": result["data"]["template_id"],
-                            "template_name": template_data["name"],
-                            "field_count": len(template_data.get("fields", []))
-                        }
+                        "status": "error",
+                        "data": {"message": error_msg}
                     }
-                else:
-                    # 核心业务逻辑返回失败，反馈给LLM
-                    error_msg = result["message"]
-                    logger.warning(f"模板创建失败: {error_msg}")
-                    conversation_history.append({
-                        "role": "assistant",
-                        "content": None,
-                        "tool_calls": [{"id": tool_call["id"], "type": "function", "function": {"name": "create_template", "arguments": template_data}}]
-                    })
-                    conversation_history.append({
-                        "role": "user",
-                        "content": f"创建失败：{error_msg}\n请根据错误信息调整模板定义。"
-                    })
-            finally:
-                db.close()
+                
+                # 定义不合法：反馈给LLM调整后重试
+                conversation_history.append({
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{"id": tool_call["id"], "type": "function", "function": {"name": "create_template", "arguments": tool_call["raw_arguments"]}}]
+                })
+                conversation_history.append({
+                    "role": "user",
+                    "content": f"创建失败：{error_msg}\n请根据错误信息调整模板定义。"
+                })
         
         except Exception as e:
             logger.error(f"处理过程中发生异常: {e}", exc_info=True)
@@ -153,3 +159,18 @@ def handle_create_template(user_input: str, user_id: int = None) -> Dict[str, An
             "last_error": "达到最大重试次数"
         }
     }
+
+
+def _create_template_in_db(template_data: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """在数据库中创建模板（同步，供线程池调用）"""
+    db = SessionLocal()
+    try:
+        return create_template_core(
+            name=template_data.get("name"),
+            fields=template_data.get("fields", []),
+            description=template_data.get("description"),
+            created_by=user_id,
+            db=db
+        )
+    finally:
+        db.close()
@@ -2,12 +2,99 @@
 Create Template Prompt Generator
 负责生成创建模板相关的Prompt和工具定义
 """
+from functools import lru_cache
 from typing import Dict, Any
 from pathlib import Path
 
 
+# create_template 工具定义（符合API接口格式，模块加载时构造一次）
+_CREATE_TEMPLATE_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "create_template",
+            "description": "创建数据收集模板，提交到后端API",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {
+                        "type": "string",
+                        "description": "模板名称，1-100字符"
+                    },
+                    "description": {
+                        "type": "string",
+                        "description": "模板描述（可选）"
+                    },
+                    "fields": {
+                        "type": "array",
+                        "description": "字段列表，至少包含一个字段",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "display_name": {
+                                    "type": "string",
+                                    "description": "字段显示名称"
+                                },
+                                "validation_rule": {
+                                    "type": "object",
+                                    "description": "验证规则JSON对象，必须包含type字段",
+                                    "properties": {
+                                        "type": {
+                                            "type": "string",
+                                            "enum": ["TEXT", "INTEGER", "FLOAT", "DATE", "DATETIME", "BOOLEAN", "EMAIL", "PHONE", "ID_CARD", "EMPLOYEE_ID"],
+                                            "description": "字段类型（必填）"
+                                        },
+                                        "required": {
+                                            "type": "boolean",
+                                            "description": "是否必填（可选）"
+                                        },
+                                        "min_length": {
+                                            "type": "integer",
+                                            "description": "最小长度（TEXT类型可选）"
+                                        },
+                                        "max_length": {
+                                            "type": "integer",
+                                            "description": "最大长度（TEXT类型可选）"
+                                        },
+                                        "min": {
+                                            "type": "number",
+                                            "description": "最小值（INTEGER/FLOAT类型可选）"
+                                        },
+                                        "max": {
+                                            "type": "number",
+                                            "description": "最大值（INTEGER/FLOAT类型可选）"
+                                        },
+                                        "options": {
+                                            "type": "array",
+                                            "items": {"type": "string"},
+                                            "description": "可选项列表（TEXT类型可选）"
+                                        },
+                                        "regex": {
+                                            "type": "string",
+                                            "description": "正则表达式（TEXT类型可选）"
+                                        }
+                                    },
+                                    "required": ["type"]
+                                },
+                                "ord": {
+                                    "type": "integer",
+                                    "description": "字段顺序，从0开始"
+                                }
+                            },
+                            "required": ["display_name", "validation_rule", "ord"]
+                        }
+                    }
+                },
+                "required": ["name", "fields"]
+            }
+        }
+    }
+]
+
+
+@lru_cache(maxsize=1)
 def generate_create_template_prompt() -> Dict[str, Any]:
-    """生成创建模板的Prompt和工具定义
+    """生成创建模板的Prompt和工具定义（内容固定，进程内只生成一次）
     
     Returns:
         {
@@ -124,130 +211,46 @@ create_template({{
 }})
 """
 
-    # 定义工具（符合API接口格式）
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "create_template",
-                "description": "创建数据收集模板，提交到后端API",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "模板名称，1-100字符"
-                        },
-                        "description": {
-                            "type": "string",
-                            "description": "模板描述（可选）"
-                        },
-                        "fields": {
-                            "type": "array",
-                            "description": "字段列表，至少包含一个字段",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "display_name": {
-                                        "type": "string",
-                                        "description": "字段显示名称"
-                                    },
-                                    "validation_rule": {
-                                        "type": "object",
-                                        "description": "验证规则JSON对象，必须包含type字段",
-                                        "properties": {
-                                            "type": {
-                                                "type": "string",
-                                                "enum": ["TEXT", "INTEGER", "FLOAT", "DATE", "DATETIME", "BOOLEAN", "EMAIL", "PHONE", "ID_CARD", "EMPLOYEE_ID"],
-                                                "description": "字段类型（必填）"
-                                            },
-                                            "required": {
-                                                "type": "boolean",
-                                                "description": "是否必填（可选）"
-                                            },
-                                            "min_length": {
-                                                "type": "integer",
-                                                "description": "最小长度（TEXT类型可选）"
-                                            },
-                                            "max_length": {
-                                                "type": "integer",
-                                                "description": "最大长度（TEXT类型可选）"
-                                            },
-                                            "min": {
-                                                "type": "number",
-                                                "description": "最小值（INTEGER/FLOAT类型可选）"
-                                            },
-                                            "max": {
-                                                "type": "number",
-                                                "description": "最大值（INTEGER/FLOAT类型可选）"
-                                            },
-                                            "options": {
-                                                "type": "array",
-                                                "items": {"type": "string"},
-                                                "description": "可选项列表（TEXT类型可选）"
-                                            },
-                                            "regex": {
-                                                "type": "string",
-                                                "description": "正则表达式（TEXT类型可选）"
-                                            }
-                                        },
-                                        "required": ["type"]
-                                    },
-                                    "ord": {
-                                        "type": "integer",
-                                        "description": "字段顺序，从0开始"
-                                    }
-                                },
-                                "required": ["display_name", "validation_rule", "ord"]
-                            }
-                        }
-                    },
-                    "required": ["name", "fields"]
-                }
-            }
-        }
-    ]
-    
     return {
         "system_prompt": system_prompt,
-        "tools": tools
+        "tools": _CREATE_TEMPLATE_TOOLS
     }
 
 
+_FIELD_TYPES_DOC = Path(__file__).parent / "field_types.md"
+
+
+@lru_cache(maxsize=1)
 def _load_field_types_doc() -> str:
-    """加载字段类型文档
+    """加载字段类型文档（只读取并裁剪一次）
     
     Returns:
         str: 字段类型文档内容（主要部分）
     """
-    doc_path = Path(__file__).parent / "field_types.md"
-    
-    if not doc_path.exists():
+    if not _FIELD_TYPES_DOC.exists():
         return "## 字段类型文档未找到\n请检查 field_types.md 文件是否存在"
     
     try:
-        with open(doc_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # 提取核心表格和规则部分（去掉完整示例）
-        # 只保留类型表格和validation_rule结构说明
-        lines = content.split('\n')
-        core_content = []
-        skip_section = False
-        
-        for line in lines:
-            # 跳过完整示例部分
-            if line.startswith('## 完整示例'):
-                skip_section = True
-            elif line.startswith('## 验证错误类型'):
-                skip_section = False
-            elif line.startswith('## API 接口格式'):
-                break
-            
-            if not skip_section:
-                core_content.append(line)
-        
-        return '\n'.join(core_content[:200])  # 限制长度，避免Prompt过长
-        
+        return _extract_core_doc(_FIELD_TYPES_DOC.read_text(encoding="utf-8"))
     except Exception as e:
         return f"## 加载字段类型文档失败\n错误: {str(e)}"
+
+
+def _extract_core_doc(content: str) -> str:
+    """提取核心表格和规则部分（去掉完整示例），只保留类型表格和validation_rule结构说明"""
+    core_content = []
+    skip_section = False
+    
+    for line in content.split('\n'):
+        # 跳过完整示例部分
+        if line.startswith('## 完整示例'):
+            skip_section = True
+        elif line.startswith('## 验证错误类型'):
+            skip_section = False
+        elif line.startswith('## API 接口格式'):
+            break
+        
+        if not skip_section:
+            core_content.append(line)
+    
+    return '\n'.join(core_content[:200])  # 限制长度，避免Prompt过长
@@ -0,0 +1,141 @@
+"""
+Intent Classifier - 本地向量意图识别
+使用本地ONNX句向量模型，将用户输入与各ACTION示例语句的类中心做余弦相似度比较。
+置信度足够时直接返回ACTION，省去一次LLM调用；置信度不足时返回None，由LLM兜底识别。
+
+模型目录（INTENT_MODEL_DIR）需包含：
+- model.onnx:      句向量模型（推荐INT8量化的 paraphrase-multilingual-MiniLM-L12-v2）
+- tokenizer.json:  对应的 HuggingFace tokenizers 分词器文件
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+from .config import Config
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每种ACTION的示例语句，用于计算类中心向量（键为 ActionType 的取值）
+_EXAMPLES: Dict[str, List[str]] = {
+    "SQL_QUERY": [
+        "查询所有院系的名称",
+        "列出我创建的所有任务",
+        "统计一下每个院系有多少位老师",
+        "显示计算机学院的教师信息",
+        "我发送过多少封邮件",
+        "查看最近收到的邮件",
+        "有哪些任务还没有截止",
+        "查一下张三老师的邮箱",
+        "我一共创建了几个模板",
+        "哪些老师还没有提交表格",
+        "展示所有汇总表的生成时间",
+        "查询职称为教授的老师",
+    ],
+    "CREATE_TEMPLATE": [
+        "创建一个收集学生基本信息的模板",
+        "帮我设计一个考勤统计表单",
+        "生成一个包含姓名、工号、职称的模板",
+        "新建一个科研项目申报模板",
+        "做一个收集教师联系方式的表单",
+        "设计一个年度工作量统计模板",
+        "帮我建一个论文发表情况的收集表",
+        "创建模板，字段有姓名、邮箱和手机号",
+        "生成一个出差报销信息模板",
+        "设计一份课程安排收集表",
+    ],
+    "SEND_EMAIL": [
+        "给张三老师发一封邮件提醒他开会",
+        "通知所有老师下周一开会",
+        "发邮件给李四，告诉他材料已经收到",
+        "给王老师发信催一下表格",
+        "帮我写一封邮件通知全院教师放假安排",
+        "给教授们发一封关于评审的通知邮件",
+        "发送邮件提醒老师们尽快提交",
+        "给赵老师发个邮件说明一下报销流程",
+        "邮件通知各位老师参加培训",
+        "给所有副教授发邮件",
+    ],
+    "CREATE_TASK": [
+        "发布一个收集教师信息的任务",
+        "用学生信息模板发起一次数据收集",
+        "创建一个任务，让所有老师填写工作量统计表",
+        "发起收集任务，截止时间是下周五",
+        "新建一个科研成果收集任务给全院老师",
+        "让计算机学院的老师们填写考勤模板",
+        "创建一个下个月截止的数据收集任务",
+        "用年度工作量模板给教授们发布任务",
+        "发起一次论文发表情况的收集",
+        "建一个任务收集老师们的联系方式",
+    ],
+}
+
+
+class IntentClassifier:
+    """本地句向量意图分类器（最近类中心 + 余弦相似度）"""
+
+    def __init__(self, model_dir: Path, threshold: float):
+        self.threshold = threshold
+        self.session = ort.InferenceSession(
+            str(model_dir / "model.onnx"),
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=128)
+        self.tokenizer.enable_padding()
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        # 预先计算各类中心向量（单位向量），分类时只需一次矩阵乘法
+        self.labels = list(_EXAMPLES)
+        centroids = np.stack([self._embed(_EXAMPLES[label]).mean(axis=0) for label in self.labels])
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    def _embed(self, texts: List[str]) -> "np.ndarray":
+        """计算一批文本的归一化句向量（mean pooling）"""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def classify(self, text: str) -> Optional[str]:
+        """返回最接近的ACTION取值；低于阈值时返回None（交由LLM识别）"""
+        scores = self.centroids @ self._embed([text])[0]
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return self.labels[best]
+
+
+@lru_cache(maxsize=1)
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """获取进程内共享的分类器；未配置模型或缺少依赖时返回None"""
+    config = Config.from_env()
+    if not config.INTENT_MODEL_DIR:
+        return None
+    if not ONNX_AVAILABLE:
+        logger.warning("已配置INTENT_MODEL_DIR，但未安装onnxruntime/tokenizers，使用LLM识别意图")
+        return None
+
+    try:
+        classifier = IntentClassifier(Path(config.INTENT_MODEL_DIR), config.INTENT_THRESHOLD)
+        logger.info(f"本地意图识别模型加载完成: {config.INTENT_MODEL_DIR}")
+        return classifier
+    except Exception as e:
+        logger.error(f"本地意图识别模型加载失败，使用LLM识别意图: {e}")
+        return None
@@ -2,16 +2,32 @@
 LLM Client - 统一的LLM交互接口
 提供标准化的LLM调用方法，支持Tool Calling
 """
+import importlib.util
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 import json
 
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from .config import Config
+from .rate_limiter import create_rate_limiter
+
+# httpx 仅在安装了 h2 时支持 HTTP/2（单连接多路复用，减少并发请求的建连次数）
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 每个连接池保留的keep-alive连接数
+MAX_KEEPALIVE_CONNECTIONS = 32
 
 
 class LLMClient:
@@ -23,12 +39,33 @@ class LLMClient:
     def __init__(self):
         self.config = Config.from_env()
         self.client = None
+        self.async_client = None
+        # 本进程的限流器：LLM_RPS 为整个服务的总速率，按Worker数均分，空闲时可突发 LLM_BURST 次
+        # （LLM_RPS<=0 时为None，不限流）
+        self.rate_limiter = create_rate_limiter(self.config.LLM_RPS, self.config.LLM_BURST)
         
         if OPENAI_AVAILABLE and self.config.API_KEY:
+            # 持久化的HTTP连接池，保持keep-alive以复用TCP/TLS连接
             self.client = OpenAI(
                 api_key=self.config.API_KEY,
                 base_url=self.config.BASE_URL,
-                timeout=self.config.TIMEOUT
+                timeout=self.config.TIMEOUT,
+                http_client=httpx.Client(
+                    timeout=self.config.TIMEOUT,
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+                )
+            )
+            # 异步客户端：供 async handler 在事件循环中调用，不阻塞工作线程
+            self.async_client = AsyncOpenAI(
+                api_key=self.config.API_KEY,
+                base_url=self.config.BASE_URL,
+                timeout=self.config.TIMEOUT,
+                http_client=httpx.AsyncClient(
+                    timeout=self.config.TIMEOUT,
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+                )
             )
     
     def chat(
@@ -74,32 +111,7 @@ class LLMClient:
                 kwargs["tool_choice"] = "auto"
             
             response = self.client.chat.completions.create(**kwargs)
-            message = response.choices[0].message
-            
-            # 解析响应
-            if message.tool_calls:
-                # Tool Calling响应
-                return {
-                    "type": "tool_call",
-                    "content": None,
-                    "tool_calls": [
-                        {
-                            "id": tc.id,
-                            "name": tc.function.name,
-                            "arguments": json.loads(tc.function.arguments)
-                        }
-                        for tc in message.tool_calls
-                    ],
-                    "raw_response": response
-                }
-            else:
-                # 普通文本响应
-                return {
-                    "type": "text",
-                    "content": message.content,
-                    "tool_calls": None,
-                    "raw_response": response
-                }
+            return self._parse_response(response)
                 
         except Exception as e:
             raise RuntimeError(f"LLM调用失败: {str(e)}")
@@ -135,29 +147,103 @@ class LLMClient:
                 kwargs["tool_choice"] = "auto"
             
             response = self.client.chat.completions.create(**kwargs)
-            message = response.choices[0].message
+            return self._parse_response(response)
+                
+        except Exception as e:
+            raise RuntimeError(f"LLM调用失败: {str(e)}")
+    
+    async def achat(
+        self,
+        system_prompt: str,
+        user_message: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.1
+    ) -> Dict[str, Any]:
+        """基础对话接口（异步版本）
+        
+        参数与返回格式同 chat()
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+        return await self.achat_with_history(messages, tools=tools, temperature=temperature)
+    
+    async def achat_with_history(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.1
+    ) -> Dict[str, Any]:
+        """带历史记录的对话接口（异步版本）
+        
+        参数与返回格式同 chat_with_history()
+        """
+        if not self.async_client:
+            raise RuntimeError("LLM客户端未初始化，请检查API_KEY配置")
+        
+        try:
+            kwargs = {
+                "model": self.config.MODEL_NAME,
+                "messages": messages,
+                "temperature": temperature
+            }
             
-            if message.tool_calls:
-                return {
-                    "type": "tool_call",
-                    "content": None,
-                    "tool_calls": [
-                        {
-                            "id": tc.id,
-                            "name": tc.function.name,
-                            "arguments": json.loads(tc.function.arguments)
-                        }
-                        for tc in message.tool_calls
-                    ],
-                    "raw_response": response
-                }
-            else:
-                return {
-                    "type": "text",
-                    "content": message.content,
-                    "tool_calls": None,
-                    "raw_response": response
-                }
+            if tools:
+                kwargs["tools"] = tools
+                kwargs["tool_choice"] = "auto"
+            
+            if self.rate_limiter:
+                await self.rate_limiter.acquire()
+            response = await self.async_client.chat.completions.create(**kwargs)
+            return self._parse_response(response)
                 
         except Exception as e:
             raise RuntimeError(f"LLM调用失败: {str(e)}")
+    
+    @staticmethod
+    def _parse_response(response) -> Dict[str, Any]:
+        """将OpenAI响应解析为统一的返回格式"""
+        message = response.choices[0].message
+        
+        if message.tool_calls:
+            # Tool Calling响应
+            return {
+                "type": "tool_call",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": tc.id,
+                        "name": tc.function.name,
+                        "arguments": _json_loads(tc.function.arguments),
+                        # 原始JSON字符串，重试时原样回传给模型，无需重新序列化
+                        "raw_arguments": tc.function.arguments
+                    }
+                    for tc in message.tool_calls
+                ],
+                "raw_response": response
+            }
+        else:
+            # 普通文本响应
+            return {
+                "type": "text",
+                "content": message.content,
+                "tool_calls": None,
+                "raw_response": response
+            }
+
+
+def trim_retry_history(history: List[Dict[str, Any]], attempt_start: int, keep: int = 2) -> int:
+    """开始新一次尝试前裁剪对话历史，返回本次尝试追加消息的起始位置
+
+    保留开头的 keep 条消息（系统提示词与用户输入）以及上一次尝试追加的反馈，
+    删除更早的尝试，使上下文不随重试次数增长。首次尝试时 attempt_start 传 len(history)。
+    """
+    del history[keep:attempt_start]
+    return len(history)
+
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    """获取进程内共享的LLMClient（复用其HTTP连接池，避免每个请求重新握手）"""
+    return LLMClient()
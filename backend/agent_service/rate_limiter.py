@@ -0,0 +1,59 @@
+"""
+Rate Limiter - 异步令牌桶限流
+在进程内为LLM调用、SMTP发送等外部服务限速，避免触发服务商的429/拒绝连接
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+
+class AsyncRateLimiter:
+    """令牌桶限流器（GCRA实现，不依赖事件循环内的锁，可跨事件循环共享）
+
+    长期平均每 period 秒最多放行 max_rate 次；空闲时允许一次性突发 burst 次
+    （默认 max_rate*period，至少1次），突发之后按速率排队。
+
+    用法:
+        async with limiter:
+            await call_external_service()
+    """
+
+    def __init__(self, max_rate: float, period: float = 1.0, burst: Optional[float] = None):
+        if max_rate <= 0:
+            raise ValueError("max_rate 必须大于0")
+        self._interval = period / max_rate
+        burst = max(burst or max_rate * period, 1)
+        # 允许提前于理论到达时间的量（即突发容量：连续 burst 次无需等待）
+        self._tolerance = (burst - 1) * self._interval
+        self._tat = 0.0  # 下一次请求的理论到达时间
+
+    async def acquire(self):
+        """获取一个令牌，超出速率时等待"""
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        # 读取与更新之间没有await，在单个事件循环内是原子的
+        self._tat = tat + self._interval
+        wait = tat - self._tolerance - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+def create_rate_limiter(rps: Optional[float], burst: Optional[float] = None) -> Optional[AsyncRateLimiter]:
+    """根据整个服务的每秒请求数创建本进程的限流器；rps为空或<=0时不限流（返回None）
+
+    限流状态无法跨进程共享，因此持续速率按 WEB_CONCURRENCY（由 app.main 导出的Worker数）均分，
+    所有Worker合计不超过 rps；burst 为每个Worker空闲时可立即放行的次数，
+    避免均分后的低速率让单个请求的几次调用也要排队
+    """
+    if not rps or rps <= 0:
+        return None
+    workers = max(int(os.getenv("WEB_CONCURRENCY") or 1), 1)
+    return AsyncRateLimiter(rps / workers, burst=burst)
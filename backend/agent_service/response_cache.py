@@ -0,0 +1,144 @@
+"""
+Response Cache - LLM工具调用结果的持久化缓存
+以 (模型, 系统提示词, 用户输入) 为键缓存最终成功的工具调用，
+相同请求再次出现时直接复用，跳过LLM调用。基于标准库sqlite3，多进程共享同一文件。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from .config import Config
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 过期记录的清理间隔（秒）；读取时已按 expires_at 过滤，清理只为控制文件大小
+SWEEP_INTERVAL = 3600
+# SQLite 主文件之外的 WAL 附属文件
+SIDECAR_SUFFIXES = ("-wal", "-shm")
+
+
+class ResponseCache:
+    """基于SQLite文件的精确匹配缓存（带过期时间）
+
+    每次操作使用独立的短连接，可在任意线程/进程中调用；读写失败只记录日志，不影响主流程。
+    所有方法都是阻塞的文件IO，异步代码中应通过 asyncio.to_thread 调用
+    """
+
+    def __init__(self, path: str, ttl: int):
+        self.path = path
+        self.ttl = ttl
+        self._last_sweep = time.monotonic()
+        self._secure_file()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response ("
+                "key TEXT PRIMARY KEY, tool_calls TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _secure_file(self):
+        """以0600权限创建缓存文件（目录不存在时以0700创建）；拒绝使用他人拥有的文件，防止缓存投毒
+
+        WAL/SHM 附属文件由SQLite按主文件的权限创建
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if hasattr(os, "getuid"):
+                if os.fstat(fd).st_uid != os.getuid():
+                    raise PermissionError(f"缓存文件 {self.path} 不属于当前用户")
+                # 已存在的文件可能是以更宽的权限创建的
+                os.fchmod(fd, 0o600)
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def _connect(self):
+        """短连接：成功时提交，结束时关闭"""
+        conn = sqlite3.connect(self.path, timeout=1.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_input: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, user_input):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """返回缓存的工具调用列表；未命中或已过期返回None"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT tool_calls FROM llm_response WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"读取LLM响应缓存失败: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, tool_calls: List[Dict[str, Any]]):
+        """缓存工具调用列表（只保存可JSON序列化的字段）"""
+        payload = json.dumps(
+            [{k: tc[k] for k in ("id", "name", "arguments", "raw_arguments")} for tc in tool_calls],
+            ensure_ascii=False
+        )
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_response (key, tool_calls, expires_at) VALUES (?, ?, ?)",
+                    (key, payload, now + self.ttl)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"写入LLM响应缓存失败: {e}")
+            return
+        
+        # 定期清理过期记录，避免每次写入都执行 DELETE（并发时偶尔重复清理无害）
+        if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL:
+            self._last_sweep = time.monotonic()
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM llm_response WHERE expires_at <= ?", (now,))
+            except sqlite3.Error as e:
+                logger.warning(f"清理LLM响应缓存失败: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取进程内共享的响应缓存；LLM_CACHE_PATH 为空或缓存文件无法打开时返回None"""
+    config = Config.from_env()
+    if not config.LLM_CACHE_PATH or config.LLM_CACHE_TTL <= 0:
+        return None
+    try:
+        return ResponseCache(config.LLM_CACHE_PATH, config.LLM_CACHE_TTL)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"无法打开LLM响应缓存 {config.LLM_CACHE_PATH}: {e}")
+        return None
+
+
+def clear_response_cache():
+    """删除缓存文件（含WAL附属文件），用于 --reset；未配置缓存时不做任何事"""
+    get_response_cache.cache_clear()
+    path = Config.from_env().LLM_CACHE_PATH
+    if not path:
+        return
+    for file in (path, *(path + suffix for suffix in SIDECAR_SUFFIXES)):
+        try:
+            os.remove(file)
+        except FileNotFoundError:
+            pass
+    logger.info(f"已清空LLM响应缓存: {path}")
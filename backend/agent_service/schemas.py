@@ -1,8 +1,11 @@
 from typing import List, Dict, Any, Union, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class AgentResponseItem(BaseModel):
     """Agent响应的单个内容块"""
+    # 不可变：预构建的响应常量（如 _UNKNOWN_RESPONSE）在请求间共享
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     format: Literal["text", "table"]
     content: Union[str, Dict[str, Any]]
     # 对于 table 格式，content 应该是 {"columns": [...], "rows": [...]}
@@ -10,4 +13,6 @@ class AgentResponseItem(BaseModel):
 
 class AgentResponse(BaseModel):
     """Agent的完整响应"""
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     items: List[AgentResponseItem]
@@ -1,21 +1,42 @@
-from typing import Dict, Any
+import asyncio
+import logging
+import smtplib
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from ..config import Config
-from ..llm_client import LLMClient
-from .prompt_generator import generate_send_email_prompt
-from .utils import fetch_teachers_for_secretary, fetch_tasks_for_secretary
+from ..llm_client import get_llm_client, trim_retry_history
+from ..rate_limiter import AsyncRateLimiter, create_rate_limiter
+from .prompt_generator import generate_send_email_prompt, search_teachers
+from .utils import fetch_send_email_context
 from .task_inference import infer_task_id
 from backend.logger import get_logger
-from backend.database.db_config import get_session_factory
+from backend.database.db_config import get_session_factory, session_scope
 from backend.utils.encryption import decrypt_value
 from backend.email_service.email_publisher import get_smtp_config
-from backend.email_service import send_email as send_email_func
+from backend.email_service import open_smtp, send_email_over
 from backend.database.models import Secretary, Teacher, SentEmail, EmailStatus
 from backend.utils import get_utc_now
 
 logger = get_logger(__name__)
 
+# Shared session factory (bound to the process-wide pool), fetched once at import
+SessionLocal = get_session_factory()
 
-def handle_send_email(user_input: str, user_id: int = None) -> Dict[str, Any]:
+# 单次发送复用的SMTP连接数上限（避免邮件服务商因并发连接过多而拒绝登录）
+MAX_CONCURRENT_SENDS = 5
+
+# 单次尝试中 list_teachers 查询次数上限（防止模型反复查询而不给出结果）
+MAX_TEACHER_LOOKUPS = 3
+
+
+@lru_cache(maxsize=1)
+def get_smtp_rate_limiter() -> Optional[AsyncRateLimiter]:
+    """This process's share of the server-wide SMTP_RPS send limit (None when SMTP_RPS <= 0)."""
+    config = Config.from_env()
+    return create_rate_limiter(config.SMTP_RPS, config.SMTP_BURST)
+
+
+async def handle_send_email(user_input: str, user_id: int = None) -> Dict[str, Any]:
     """Handle send_email action: ask LLM to produce subject/body/recipients, then send.
 
     Returns structure similar to other handlers:
@@ -25,17 +46,17 @@ def handle_send_email(user_input: str, user_id: int = None) -> Dict[str, Any]:
         return {"status": "error", "data": {"message": "缺少 user_id，无法发送邮件"}}
 
     config = Config.from_env()
-    llm_client = LLMClient()
-    SessionLocal = get_session_factory()
+    llm_client = get_llm_client()
 
-    # Fetch teachers once
-    teacher_list = fetch_teachers_for_secretary(user_id)
+    # Fetch teachers and tasks in one session (one pooled connection, one worker thread)
+    teacher_list, tasks = await asyncio.to_thread(fetch_send_email_context, user_id)
     logger.info(f"Fetched {len(teacher_list)} teachers for secretary ID {user_id}")
-    logger.info(f"Teacher list:\n{chr(10).join([str(t) for t in teacher_list])}")
+    if logger.isEnabledFor(logging.DEBUG):
+        # Formatting the whole roster is O(N); only do it when DEBUG records are emitted
+        logger.debug("Teacher list:\n%s", "\n".join(map(str, teacher_list)))
     
     # Infer Task ID
-    tasks = fetch_tasks_for_secretary(user_id)
-    inferred_task_id = infer_task_id(user_input, tasks)
+    inferred_task_id = await infer_task_id(user_input, tasks)
     if inferred_task_id:
         logger.info(f"Inferred related Task ID: {inferred_task_id}")
     else:
@@ -52,15 +73,42 @@ def handle_send_email(user_input: str, user_id: int = None) -> Dict[str, Any]:
     ]
 
     max_retries = config.MAX_RETRY
+    attempt_start = len(conversation_history)
     for attempt in range(1, max_retries + 1):
         logger.info(f"发送邮件尝试 {attempt}/{max_retries}")
+        attempt_start = trim_retry_history(conversation_history, attempt_start)
         try:
-            llm_response = llm_client.chat_with_history(
+            llm_response = await llm_client.achat_with_history(
                 messages=conversation_history,
                 tools=tools,
                 temperature=0.2
             )
 
+            # Answer list_teachers lookups (large departments) from the cached roster
+            lookups = 0
+            while (llm_response["type"] == "tool_call"
+                   and llm_response["tool_calls"][0]["name"] == "list_teachers"
+                   and lookups < MAX_TEACHER_LOOKUPS):
+                lookups += 1
+                lookup = llm_response["tool_calls"][0]
+                keyword = lookup["arguments"].get("keyword")
+                logger.info(f"LLM查询候选教师: {keyword!r}")
+                conversation_history.append({
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [{"id": lookup["id"], "type": "function", "function": {"name": "list_teachers", "arguments": lookup["raw_arguments"]}}]
+                })
+                conversation_history.append({
+                    "role": "tool",
+                    "tool_call_id": lookup["id"],
+                    "content": search_teachers(teacher_list, keyword)
+                })
+                llm_response = await llm_client.achat_with_history(
+                    messages=conversation_history,
+                    tools=tools,
+                    temperature=0.2
+                )
+
             if llm_response["type"] != "tool_call":
                 logger.error("LLM未返回send_email工具调用")
                 conversation_history.append({"role": "assistant", "content": llm_response.get("content")})
@@ -86,9 +134,17 @@ def handle_send_email(user_input: str, user_id: int = None) -> Dict[str, Any]:
                 return {"status": "error", "data": {"message": "未能推断出目标收件人，请提供明确的教师列表或联系方式"}}
 
             # Normalize recipients to emails and validate they are within department
-            # Use the already fetched teacher_list for validation
-            allowed_emails = {t['email']: t for t in teacher_list if t.get('email')}
-            allowed_ids = {str(t['id']): t for t in teacher_list}
+            # Use the already fetched teacher_list for validation, indexing only the
+            # teachers actually referenced (one pass, no department-sized dicts)
+            wanted = {str(r).strip() for r in recipients}
+            allowed_ids = {}
+            allowed_emails = {}
+            for t in teacher_list:
+                tid = str(t['id'])
+                if tid in wanted:
+                    allowed_ids[tid] = t
+                if t.get('email') in wanted:
+                    allowed_emails[t['email']] = t
 
             final_recipients = []
             recipient_teacher_ids = []
@@ -110,63 +166,140 @@ def handle_send_email(user_input: str, user_id: int = None) -> Dict[str, Any]:
             if not final_recipients:
                 return {"status": "error", "data": {"message": "没有有效的收件人邮箱，操作终止"}}
 
-            # Send emails
-            db = SessionLocal()
-            try:
-                sec = db.query(Secretary).filter(Secretary.id == user_id).first()
-                if not sec:
-                    return {"status": "error", "data": {"message": "未找到当前秘书信息"}}
+            # Load sender credentials
+            sender, error_msg = await asyncio.to_thread(_load_sender, user_id)
+            if error_msg:
+                return {"status": "error", "data": {"message": error_msg}}
 
-                # Decrypt secretary auth code for SMTP
-                if not sec.mail_auth_code:
-                    return {"status": "error", "data": {"message": "当前秘书未配置邮箱授权码，无法发送邮件"}}
+            # Send to all recipients concurrently over a small pool of persistent SMTP
+            # connections: each connection does TLS + login once, then sends many emails
+            email_content = {"subject": subject, "body": body, "attachments": []}
+            rate_limiter = get_smtp_rate_limiter()
+            connections: asyncio.Queue = asyncio.Queue()
+            for _ in range(min(MAX_CONCURRENT_SENDS, len(final_recipients))):
+                connections.put_nowait(None)  # opened lazily by the first send that takes it
 
+            async def send_one(to_email: str) -> Dict[str, Any]:
+                server = await connections.get()
                 try:
-                    auth_code = decrypt_value(sec.mail_auth_code)
-                except Exception as e:
-                    logger.error(f"解密邮箱授权码失败: {e}")
-                    return {"status": "error", "data": {"message": "解密邮箱授权码失败，无法发送邮件"}}
-
-                smtp_cfg = get_smtp_config(sec.email)
-
-                # Only send once for all recipients using same content
-                results = []
-                for idx, to_email in enumerate(final_recipients):
-                    result = send_email_func(
-                        sender_email=sec.email,
-                        sender_password=auth_code,
-                        receiver_email=to_email,
-                        email_content={"subject": subject, "body": body, "attachments": []},
-                        smtp_server=smtp_cfg['smtp_server'],
-                        smtp_port=smtp_cfg['smtp_port']
-                    )
-
-                    # Record to DB
-                    status = EmailStatus.SENT if result.get('success') else EmailStatus.FAILED
-                    sent_email = SentEmail(
-                        task_id=inferred_task_id,
-                        from_sec_id=sec.id,
-                        to_tea_id=recipient_teacher_ids[idx] if idx < len(recipient_teacher_ids) else None,
-                        sent_at=get_utc_now() if result.get('success') else None,
-                        status=status,
-                        mail_content={"subject": subject, "body": body},
-                        attachment_id=None,
-                        extra={"error": result.get('message')} if not result.get('success') else None
-                    )
-                    db.add(sent_email)
-                    results.append(result)
-
-                db.commit()
-
-                # Summarize results
-                success_count = sum(1 for r in results if r.get('success'))
-                return {"status": "success", "data": {"sent": success_count, "total": len(results), "results": results}}
+                    if rate_limiter:
+                        await rate_limiter.acquire()
+                    result, server = await asyncio.to_thread(_send_pooled, server, sender, to_email, email_content)
+                    return result
+                finally:
+                    connections.put_nowait(server)
 
+            try:
+                results = list(await asyncio.gather(*(send_one(to_email) for to_email in final_recipients)))
             finally:
-                db.close()
+                open_servers = [server for server in (connections.get_nowait() for _ in range(connections.qsize())) if server]
+                if open_servers:
+                    await asyncio.to_thread(_close_smtp, open_servers)
+
+            # Record to DB once all sends have finished
+            await asyncio.to_thread(
+                _record_sent_emails, sender["id"], inferred_task_id, recipient_teacher_ids, subject, body, results
+            )
+
+            # Summarize results
+            success_count = sum(1 for r in results if r.get('success'))
+            return {"status": "success", "data": {"sent": success_count, "total": len(results), "results": results}}
 
         except Exception as e:
             logger.error(f"处理send_email过程中发生异常: {e}", exc_info=True)
             conversation_history.append({"role": "user", "content": f"发生错误：{str(e)}\n请重新生成邮件内容。"})
 
     return {"status": "error", "data": {"message": f"经过 {max_retries} 次尝试仍未成功生成发送邮件的内容"}}
+
+
+def _load_sender(user_id: int) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Load the secretary's SMTP credentials. Returns (sender, None) or (None, error message)."""
+    db = SessionLocal()
+    try:
+        sec = db.query(Secretary).filter(Secretary.id == user_id).first()
+        if not sec:
+            return None, "未找到当前秘书信息"
+
+        # Decrypt secretary auth code for SMTP
+        if not sec.mail_auth_code:
+            return None, "当前秘书未配置邮箱授权码，无法发送邮件"
+
+        try:
+            auth_code = decrypt_value(sec.mail_auth_code)
+        except Exception as e:
+            logger.error(f"解密邮箱授权码失败: {e}")
+            return None, "解密邮箱授权码失败，无法发送邮件"
+
+        smtp_cfg = get_smtp_config(sec.email)
+        return {
+            "id": sec.id,
+            "email": sec.email,
+            "auth_code": auth_code,
+            "smtp_server": smtp_cfg['smtp_server'],
+            "smtp_port": smtp_cfg['smtp_port']
+        }, None
+    finally:
+        db.close()
+
+
+def _send_pooled(
+    server: Optional[smtplib.SMTP],
+    sender: Dict[str, Any],
+    to_email: str,
+    email_content: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Optional[smtplib.SMTP]]:
+    """Send one email over a pooled connection, (re)connecting when needed.
+
+    Returns (result, connection to hand back to the pool; None if unusable).
+    """
+    for attempt in range(2):
+        if server is None:
+            try:
+                server = open_smtp(sender["email"], sender["auth_code"], sender["smtp_server"], sender["smtp_port"])
+            except Exception as e:
+                return {"success": False, "message": f"邮件发送失败: {str(e)}", "error": str(e)}, None
+        try:
+            return send_email_over(server, sender["email"], to_email, email_content), server
+        except smtplib.SMTPServerDisconnected as e:
+            # Server dropped the idle/used connection: reconnect once and retry
+            _close_smtp([server])
+            server = None
+            if attempt == 1:
+                return {"success": False, "message": f"邮件发送失败: {str(e)}", "error": str(e)}, None
+
+
+def _close_smtp(servers: List[smtplib.SMTP]) -> None:
+    for server in servers:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+def _record_sent_emails(
+    sec_id: int,
+    task_id: Optional[int],
+    recipient_teacher_ids: List[int],
+    subject: str,
+    body: str,
+    results: List[Dict[str, Any]]
+) -> None:
+    """Write one SentEmail row per send result, in a single transaction."""
+    now = get_utc_now()
+    mail_content = {"subject": subject, "body": body}
+    rows = [
+        {
+            "task_id": task_id,
+            "from_sec_id": sec_id,
+            "to_tea_id": recipient_teacher_ids[idx] if idx < len(recipient_teacher_ids) else None,
+            "sent_at": now if result.get('success') else None,
+            "status": EmailStatus.SENT if result.get('success') else EmailStatus.FAILED,
+            "mail_content": mail_content,
+            "attachment_id": None,
+            "extra": {"error": result.get('message')} if not result.get('success') else None
+        }
+        for idx, result in enumerate(results)
+    ]
+    # Bulk insert: one executemany round-trip, no per-object unit-of-work bookkeeping
+    with session_scope() as db:
+        db.bulk_insert_mappings(SentEmail, rows)
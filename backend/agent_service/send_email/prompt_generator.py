@@ -1,32 +1,14 @@
-from typing import Dict, Any, List
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
 from .utils import fetch_teachers_for_secretary
 
 
-def generate_send_email_prompt(user_id: int = None, teacher_list: List[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Generate system prompt and tool definition for send_email action.
-
-    The prompt embeds a short list of candidate teachers (from the same department as
-    the secretary identified by `user_id`) and instructs the LLM to produce a JSON
-    containing `subject`, `body`, and `recipients` (list of teacher ids or emails).
-    """
-    if teacher_list is None and user_id is not None:
-        teacher_list = fetch_teachers_for_secretary(user_id)
-    elif teacher_list is None:
-        teacher_list = []
-
-    # Build a compact representation of teachers for embedding into the prompt
-    teacher_lines = []
-    for t in teacher_list:
-        teacher_lines.append(f"- id:{t['id']} | 工号:{t['employee_id']} | 姓名:{t['name']} | 邮箱:{t['email']} | 手机:{t.get('phone','')} | 职称:{t.get('title','')} | 办公:{t.get('office','')}")
-
-    teachers_text = "\n".join(teacher_lines) if teacher_lines else "(未找到本部门教师列表)"
-
-    system_prompt = f"""你是邮件撰写助手，负责将用户的自然语言意图转换成正式邮件。
+_STATIC_RULES = """你是邮件撰写助手，负责将用户的自然语言意图转换成正式邮件。
 
 规则：
 1) 只生成邮件的 `subject` 和 `body`（中文场景下请使用恰当的礼貌用语），保证语气与用户要求一致。
 2) 不要添加附件。如果用户明确要求附件，拒绝执行并在结果中返回错误说明。
-3) 接收者(`recipients`)必须从下面提供的候选教师列表中选择（可选多个）。候选教师列表：\n{teachers_text}\n
+3) 接收者(`recipients`)必须从候选教师中选择（可选多个）。候选教师列在本提示末尾；若末尾提示教师较多未列出，请先调用 `list_teachers` 工具按姓名等关键词查询。
 4) 如果用户无法明确指定接收者，或者候选列表为空，请拒绝执行并说明原因（例如：‘无法推断目标教师，请手动选择或提供老师列表’）。
 5) 一次发送操作使用一份邮件内容发送给所有选定接收者。
 6) 返回格式必须为一次性工具调用 `send_email`，并且 `arguments` 字段为 JSON 对象，包含：
@@ -40,24 +22,106 @@ send_email(subject="...", body="...", recipients=["1","2"])
 
 请严格按照上述要求只返回工具调用，不要输出任何额外解释。"""
 
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "send_email",
-                "description": "生成邮件并返回要发送的内容和接收者列表（不负责实际发送，handler负责发送）",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "subject": {"type": "string"},
-                        "body": {"type": "string"},
-                        "recipients": {"type": "array", "items": {"type": "string"}},
-                        "attachments": {"type": "array", "items": {"type": "string"}}
-                    },
-                    "required": ["subject", "body", "recipients"]
-                }
+# 院系教师数超过此值时不再内联到Prompt，改为由LLM通过 list_teachers 工具按需查询
+INLINE_TEACHER_LIMIT = 100
+
+_SEND_EMAIL_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "send_email",
+        "description": "生成邮件并返回要发送的内容和接收者列表（不负责实际发送，handler负责发送）",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "subject": {"type": "string"},
+                "body": {"type": "string"},
+                "recipients": {"type": "array", "items": {"type": "string"}},
+                "attachments": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["subject", "body", "recipients"]
+        }
+    }
+}
+
+_LIST_TEACHERS_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "list_teachers",
+        "description": "按关键词（姓名、邮箱、职称或办公地点的一部分）查询本院系的候选教师；关键词为空时返回全部教师",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "keyword": {"type": "string"}
             }
         }
+    }
+}
+
+
+def format_teacher_line(t: Dict[str, Any]) -> str:
+    return f"- id:{t['id']} | 工号:{t['employee_id']} | 姓名:{t['name']} | 邮箱:{t['email']} | 手机:{t.get('phone','')} | 职称:{t.get('title','')} | 办公:{t.get('office','')}"
+
+
+def search_teachers(teacher_list: List[Dict[str, Any]], keyword: str = None) -> str:
+    """Answer a list_teachers tool call: matching teacher lines, one per line."""
+    keyword = (keyword or "").strip()
+    matches = [
+        t for t in teacher_list
+        if not keyword or any(keyword in str(t.get(k) or '') for k in ('name', 'email', 'title', 'office'))
     ]
+    return "\n".join(format_teacher_line(t) for t in matches) if matches else "(没有匹配的教师)"
+
+
+# secretary_id -> (teacher_list, formatted text). fetch_teachers_for_secretary /
+# fetch_send_email_context return the same list object until their TTL expires,
+# so an identity check is enough to know the cached text is still current.
+TEACHERS_TEXT_CACHE_SIZE = 256
+_teachers_text_cache: "OrderedDict[int, Tuple[List[Dict[str, Any]], str]]" = OrderedDict()
+
+
+def _format_teachers_text(user_id: int, teacher_list: List[Dict[str, Any]]) -> str:
+    """Format the inline roster once per fetched teacher list."""
+    cached = _teachers_text_cache.get(user_id)
+    if cached is not None and cached[0] is teacher_list:
+        _teachers_text_cache.move_to_end(user_id)
+        return cached[1]
+
+    text = "\n".join(format_teacher_line(t) for t in teacher_list)
+    if user_id is not None:
+        _teachers_text_cache[user_id] = (teacher_list, text)
+        if len(_teachers_text_cache) > TEACHERS_TEXT_CACHE_SIZE:
+            _teachers_text_cache.popitem(last=False)
+    return text
+
+
+def generate_send_email_prompt(user_id: int = None, teacher_list: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate system prompt and tool definition for send_email action.
+
+    The prompt embeds the list of candidate teachers (from the same department as
+    the secretary identified by `user_id`); departments larger than
+    INLINE_TEACHER_LIMIT get a `list_teachers` lookup tool instead. It instructs the
+    LLM to produce a JSON containing `subject`, `body`, and `recipients` (list of teacher ids or emails).
+    """
+    if teacher_list is None and user_id is not None:
+        teacher_list = fetch_teachers_for_secretary(user_id)
+    elif teacher_list is None:
+        teacher_list = []
+
+    # Static rules first, per-secretary teacher list last: the shared prefix stays
+    # byte-identical across requests so provider-side prompt caching can reuse it
+    if len(teacher_list) > INLINE_TEACHER_LIMIT:
+        teachers_text = f"(本院系共 {len(teacher_list)} 位教师，未在此列出，请调用 list_teachers 工具查询)"
+    elif teacher_list:
+        # Build a compact representation of teachers for embedding into the prompt
+        teachers_text = _format_teachers_text(user_id, teacher_list)
+    else:
+        teachers_text = "(未找到本部门教师列表)"
+
+    system_prompt = f"{_STATIC_RULES}\n\n候选教师列表：\n{teachers_text}"
+
+    if len(teacher_list) > INLINE_TEACHER_LIMIT:
+        tools = [_SEND_EMAIL_TOOL, _LIST_TEACHERS_TOOL]
+    else:
+        tools = [_SEND_EMAIL_TOOL]
 
     return {"system_prompt": system_prompt, "tools": tools}
@@ -1,10 +1,52 @@
-from typing import List, Dict, Any, Optional
-from ..llm_client import LLMClient
+import re
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from ..llm_client import get_llm_client
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
-def infer_task_id(user_input: str, tasks: List[Dict[str, Any]]) -> Optional[int]:
+# Exact-match cache: (user_input, task list) -> inferred task id (None when unrelated)
+INFERENCE_CACHE_SIZE = 1024
+_inference_cache: "OrderedDict[Tuple[str, Tuple], Optional[int]]" = OrderedDict()
+
+# Only the head of each description is used for the keyword pre-filter
+DESCRIPTION_KEYWORD_CHARS = 40
+
+_CJK_RUN_RE = re.compile(r"[\u4e00-\u9fff]+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Bigrams common to almost every email request; they say nothing about which task is meant
+_STOP_KEYWORDS = frozenset({"老师", "各位", "请各", "教师", "大家", "邮件", "发送", "通知", "一下"})
+
+
+def _keywords(text: str) -> set:
+    """Character bigrams of CJK runs (single chars for 1-char runs) plus lowercase ASCII words."""
+    keys = set(_WORD_RE.findall(text.lower()))
+    for run in _CJK_RUN_RE.findall(text):
+        if len(run) == 1:
+            keys.add(run)
+        else:
+            keys.update(run[i:i + 2] for i in range(len(run) - 1))
+    return keys - _STOP_KEYWORDS
+
+
+def _may_mention_task(user_input: str, tasks: List[Dict[str, Any]]) -> bool:
+    """Cheap pre-filter: False when the input shares no keyword with any task's id, name or description."""
+    task_keys = set()
+    for t in tasks:
+        task_keys.add(str(t['id']))
+        task_keys |= _keywords(t['name'] or '')
+        task_keys |= _keywords((t['description'] or '')[:DESCRIPTION_KEYWORD_CHARS])
+    return not task_keys.isdisjoint(_keywords(user_input))
+
+
+def clear_inference_cache():
+    """Drop all cached task inferences."""
+    _inference_cache.clear()
+
+
+async def infer_task_id(user_input: str, tasks: List[Dict[str, Any]]) -> Optional[int]:
     """
     Ask LLM to infer if the user's email intent is related to a specific existing task.
     
@@ -18,6 +60,20 @@ def infer_task_id(user_input: str, tasks: List[Dict[str, Any]]) -> Optional[int]
     if not tasks:
         return None
 
+    # No keyword overlap with any task: skip the LLM round-trip entirely
+    if not _may_mention_task(user_input, tasks):
+        logger.info("No keyword overlap with any task; skipping task inference.")
+        return None
+
+    # The task list is part of the key, so adding/renaming a task never hits a stale entry
+    cache_key = (
+        user_input.strip(),
+        tuple(sorted((t['id'], t['name'], t['description'] or '') for t in tasks))
+    )
+    if cache_key in _inference_cache:
+        _inference_cache.move_to_end(cache_key)
+        return _inference_cache[cache_key]
+
     # Format task list for prompt
     tasks_str = "\n".join([
         f"- ID: {t['id']}, Name: {t['name']}, Description: {t['description'] or 'None'}"
@@ -39,11 +95,11 @@ def infer_task_id(user_input: str, tasks: List[Dict[str, Any]]) -> Optional[int]
 请只输出一个数字（任务ID或-1），不要包含任何其他文字或解释。
 """
 
-    llm_client = LLMClient()
+    llm_client = get_llm_client()
     
     try:
         # We use a simple chat call here, no tools needed, just expecting a number.
-        response = llm_client.chat(
+        response = await llm_client.achat(
             system_prompt=system_prompt,
             user_message="请分析并返回ID", # The user input is already in system prompt context
             temperature=0.1
@@ -59,12 +115,12 @@ def infer_task_id(user_input: str, tasks: List[Dict[str, Any]]) -> Optional[int]
             return None
             
         if task_id == -1:
-            return None
+            return _remember(cache_key, None)
             
         # Verify the ID is actually in our list
         valid_ids = {t['id'] for t in tasks}
         if task_id in valid_ids:
-            return task_id
+            return _remember(cache_key, task_id)
         else:
             logger.warning(f"LLM returned task ID {task_id} which is not in the valid list.")
             return None
@@ -72,3 +128,11 @@ def infer_task_id(user_input: str, tasks: List[Dict[str, Any]]) -> Optional[int]
     except Exception as e:
         logger.error(f"Error during task inference: {e}")
         return None
+
+
+def _remember(cache_key: Tuple[str, Tuple], task_id: Optional[int]) -> Optional[int]:
+    """Cache a well-formed answer (malformed replies and errors are never cached)."""
+    _inference_cache[cache_key] = task_id
+    if len(_inference_cache) > INFERENCE_CACHE_SIZE:
+        _inference_cache.popitem(last=False)
+    return task_id
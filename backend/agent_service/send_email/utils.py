@@ -1,53 +1,77 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from sqlalchemy.orm import Session
 from backend.database.db_config import get_session_factory
 from backend.database.models import Secretary, Teacher, CollectTask
+from backend.utils.cache_utils import ttl_cache
 
+# Department rosters and task lists change on human timescales; a short TTL keeps
+# repeated sends from re-querying while bounding staleness to this many seconds.
+SECRETARY_CACHE_TTL = 60
 
+# Shared session factory (bound to the process-wide pool), fetched once at import
+SessionLocal = get_session_factory()
+
+
+@ttl_cache(ttl=SECRETARY_CACHE_TTL)
+def fetch_send_email_context(secretary_id: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (teachers, tasks) for the secretary, both queried in one session."""
+    db = SessionLocal()
+    try:
+        return _query_teachers(db, secretary_id), _query_tasks(db, secretary_id)
+    finally:
+        db.close()
+
+
+@ttl_cache(ttl=SECRETARY_CACHE_TTL)
 def fetch_teachers_for_secretary(secretary_id: int) -> List[Dict[str, Any]]:
     """Query DB and return a list of teachers in the secretary's department.
 
     Returns minimal teacher info: id, employee id (工号), name, email, phone, title, office
     """
-    SessionLocal = get_session_factory()
     db = SessionLocal()
     try:
-        sec = db.query(Secretary).filter(Secretary.id == secretary_id).first()
-        if not sec:
-            return []
-        dept_id = sec.department_id
-        teachers = db.query(Teacher).filter(Teacher.department_id == dept_id).all()
-        result = []
-        for t in teachers:
-            result.append({
-                "id": t.id,
-                "employee_id": t.id,
-                "name": t.name,
-                "email": t.email,
-                "phone": t.phone,
-                "title": t.title,
-                "office": t.office
-            })
-        return result
+        return _query_teachers(db, secretary_id)
     finally:
         db.close()
 
 
+@ttl_cache(ttl=SECRETARY_CACHE_TTL)
 def fetch_tasks_for_secretary(secretary_id: int) -> List[Dict[str, Any]]:
     """Query DB and return a list of tasks created by the secretary.
 
     Returns minimal task info: id, name, description
     """
-    SessionLocal = get_session_factory()
     db = SessionLocal()
     try:
-        tasks = db.query(CollectTask).filter(CollectTask.created_by == secretary_id).all()
-        result = []
-        for t in tasks:
-            result.append({
-                "id": t.id,
-                "name": t.name,
-                "description": t.description
-            })
-        return result
+        return _query_tasks(db, secretary_id)
     finally:
         db.close()
+
+
+def _query_teachers(db: Session, secretary_id: int) -> List[Dict[str, Any]]:
+    dept_id = db.query(Secretary.department_id).filter(
+        Secretary.id == secretary_id
+    ).scalar_subquery()
+    # Column query: plain Row tuples, no ORM object hydration
+    rows = db.query(
+        Teacher.id, Teacher.name, Teacher.email, Teacher.phone, Teacher.title, Teacher.office
+    ).filter(Teacher.department_id == dept_id).all()
+    return [
+        {
+            "id": r.id,
+            "employee_id": r.id,
+            "name": r.name,
+            "email": r.email,
+            "phone": r.phone,
+            "title": r.title,
+            "office": r.office
+        }
+        for r in rows
+    ]
+
+
+def _query_tasks(db: Session, secretary_id: int) -> List[Dict[str, Any]]:
+    rows = db.query(
+        CollectTask.id, CollectTask.name, CollectTask.description
+    ).filter(CollectTask.created_by == secretary_id).all()
+    return [{"id": r.id, "name": r.name, "description": r.description} for r in rows]
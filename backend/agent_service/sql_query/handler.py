@@ -2,11 +2,13 @@
 SQL Query Handler - SQL查询ACTION的入口函数
 负责协调整个SQL查询流程
 """
+import asyncio
 from typing import Dict, Any
 from pathlib import Path
 
 from ..config import Config
-from ..llm_client import LLMClient
+from ..llm_client import get_llm_client, trim_retry_history
+from ..response_cache import ResponseCache, get_response_cache
 from .prompt_generator import generate_sql_query_prompt
 from .sql_validator import SQLValidator
 from .sql_executor import SQLExecutor
@@ -15,7 +17,7 @@ from backend.logger import get_logger
 logger = get_logger(__name__)
 
 
-def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
+async def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
     """SQL查询ACTION的处理入口
     
     工作流程：
@@ -43,7 +45,7 @@ def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
     """
     # 初始化组件（数据库使用项目统一配置）
     config = Config.from_env()
-    llm_client = LLMClient()
+    llm_client = get_llm_client()
     validator = SQLValidator(dialect="postgres")
     executor = SQLExecutor()  # 不再需要传递config
     
@@ -60,17 +62,32 @@ def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
         {"role": "user", "content": user_input}
     ]
     
+    # 持久化响应缓存：键包含模型与系统提示词（含用户ID），不同用户/Schema不会互相命中
+    # （SQLite文件IO，与SQL执行一样放到线程中，不阻塞事件循环）
+    response_cache = await asyncio.to_thread(get_response_cache)
+    cache_key = ResponseCache.make_key(config.MODEL_NAME, system_prompt, user_input) if response_cache else None
+    
+    attempt_start = len(conversation_history)
     for attempt in range(1, max_retries + 1):
         logger.info(f"SQL查询尝试 {attempt}/{max_retries}")
+        attempt_start = trim_retry_history(conversation_history, attempt_start)
         
         try:
-            # 调用LLM生成SQL
-            logger.info("正在调用 LLM 生成 SQL...")
-            llm_response = llm_client.chat_with_history(
-                messages=conversation_history,
-                tools=tools,
-                temperature=0.1
-            )
+            # 首次尝试优先复用相同请求此前成功执行过的SQL
+            cached_tool_calls = None
+            if response_cache and attempt == 1:
+                cached_tool_calls = await asyncio.to_thread(response_cache.get, cache_key)
+            if cached_tool_calls:
+                logger.info("命中LLM响应缓存，跳过 LLM 调用")
+                llm_response = {"type": "tool_call", "content": None, "tool_calls": cached_tool_calls}
+            else:
+                # 调用LLM生成SQL
+                logger.info("正在调用 LLM 生成 SQL...")
+                llm_response = await llm_client.achat_with_history(
+                    messages=conversation_history,
+                    tools=tools,
+                    temperature=0.1
+                )
             
             # 检查是否是Tool Calling响应
             if llm_response["type"] != "tool_call":
@@ -109,7 +126,7 @@ def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
                 conversation_history.append({
                     "role": "assistant",
                     "content": None,
-                    "tool_calls": [{"id": tool_call["id"], "type": "function", "function": {"name": "run_sql", "arguments": arguments}}]
+                    "tool_calls": [{"id": tool_call["id"], "type": "function", "function": {"name": "run_sql", "arguments": tool_call["raw_arguments"]}}]
                 })
                 conversation_history.append({
                     "role": "user",
@@ -119,12 +136,15 @@ def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
             
             # 执行SQL
             logger.info("正在执行 SQL 查询...")
-            result = executor.execute(sql)
+            result = await asyncio.to_thread(executor.execute, sql)
             
             if result["status"] == "success":
                 logger.info(f"SQL执行成功，返回 {result['data']['row_count']} 行")
                 # 将权限警告添加到返回结果中
                 result["data"]["permission_warning"] = permission_warning
+                # 只缓存执行成功的最终工具调用
+                if response_cache and not cached_tool_calls:
+                    await asyncio.to_thread(response_cache.set, cache_key, llm_response["tool_calls"])
                 return result
             else:
                 # SQL执行失败，反馈给LLM
@@ -133,7 +153,7 @@ def handle_sql_query(user_input: str, user_id: int = None) -> Dict[str, Any]:
                 conversation_history.append({
                     "role": "assistant",
                     "content": None,
-                    "tool_calls": [{"id": tool_call["id"], "type": "function", "function": {"name": "run_sql", "arguments": arguments}}]
+                    "tool_calls": [{"id": tool_call["id"], "type": "function", "function": {"name": "run_sql", "arguments": tool_call["raw_arguments"]}}]
                 })
                 conversation_history.append({
                     "role": "user",
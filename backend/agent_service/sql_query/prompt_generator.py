@@ -2,33 +2,51 @@
 SQL Query Prompt Generator
 负责生成SQL查询相关的Prompt和工具定义
 """
-from typing import Dict, Any, List
-from .schema_loader import schema_loader
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from .schema_loader import load_schema, get_table_names
+
+
+# run_sql 工具定义（固定不变，模块加载时构造一次）
+_SQL_QUERY_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "run_sql",
+            "description": "执行SQL查询并返回结果",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "sql": {
+                        "type": "string",
+                        "description": "要执行的SQL SELECT查询语句"
+                    },
+                    "permission_warning": {
+                        "type": "string",
+                        "description": "如果用户的请求超出了权限范围（例如请求查看他人的私有数据），在此字段中说明原因。如果未越权，则留空。"
+                    }
+                },
+                "required": ["sql"]
+            }
+        }
+    }
+]
 
 
-def generate_sql_query_prompt(user_id: int = None) -> Dict[str, Any]:
-    """生成SQL查询的Prompt和工具定义
+@lru_cache(maxsize=2)
+def _static_prompt(with_user: bool) -> str:
+    """与用户无关的提示词主体（Schema与规则），按是否有用户ID缓存
     
-    Args:
-        user_id: 当前用户的ID（secretary表的主键），用于权限控制
-        
-    Returns:
-        {
-            "system_prompt": str,        # 系统提示词
-            "tools": List[Dict],          # 工具定义（Tool Calling）
-            "allowed_tables": List[str]   # 允许查询的表名列表
-        }
+    用户ID不嵌入其中，只追加在末尾，使所有用户共享同一段前缀，便于模型服务端的前缀缓存命中
     """
-    # 加载数据库Schema
-    schema_text = schema_loader.load_schema()
-    allowed_tables = schema_loader.get_table_names()
+    schema_text = load_schema()
     
     # 构建权限控制说明
     permission_instruction = ""
-    if user_id is not None:
-        permission_instruction = f"""
+    if with_user:
+        permission_instruction = """
 ## 权限控制规则（必须严格遵守）
-当前用户的ID (secretary_id) 为: {user_id}
+当前用户的ID (secretary_id) 见本提示末尾，下文中的 `<当前用户ID>` 均指该值。
 
 你必须根据以下规则限制查询范围：
 
@@ -40,14 +58,14 @@ def generate_sql_query_prompt(user_id: int = None) -> Dict[str, Any]:
    - 表：除上述公开表之外的所有表（如 `collect_task`, `template_form`, `sent_email` 等）
    - 规则：必须在 WHERE 子句中添加过滤条件，确保只查询当前用户创建或相关的数据。
    - 示例：
-     - 查询任务：`WHERE created_by = {user_id}`
-     - 查询模板：`WHERE created_by = {user_id}`
-     - 查询发送邮件：`WHERE from_sec_id = {user_id}`
-     - 查询接收邮件：`WHERE to_sec_id = {user_id}`
+     - 查询任务：`WHERE created_by = <当前用户ID>`
+     - 查询模板：`WHERE created_by = <当前用户ID>`
+     - 查询发送邮件：`WHERE from_sec_id = <当前用户ID>`
+     - 查询接收邮件：`WHERE to_sec_id = <当前用户ID>`
      - 查询关联表（如 `template_form_field`）：必须通过 JOIN 确保主表（`template_form`）是当前用户创建的。
 
 3. **越权与敏感信息请求处理**：
-   - **越权数据**：如果用户显式要求查询超出其权限范围的数据（例如"查询所有人的任务"），你必须**拒绝**该越权请求，仍然强制加上 `WHERE created_by = {user_id}` 等限制条件。
+   - **越权数据**：如果用户显式要求查询超出其权限范围的数据（例如"查询所有人的任务"），你必须**拒绝**该越权请求，仍然强制加上 `WHERE created_by = <当前用户ID>` 等限制条件。
    - **敏感字段**：如果用户请求查询包含敏感信息的字段（如 `password_hash`, `mail_auth_code`, `extra` 中的敏感配置等），你必须**拒绝**返回这些字段，将其从 SELECT 列表中移除。
    - **处理方式**：在执行上述过滤的同时，你必须在 `run_sql` 工具的 `permission_warning` 字段中说明情况（例如："已为您过滤显示本人的任务数据" 或 "出于安全考虑，已隐藏密码等敏感信息"）。
 
@@ -84,7 +102,7 @@ def generate_sql_query_prompt(user_id: int = None) -> Dict[str, Any]:
 ## 工作流程
 1. 分析用户需求，确定需要查询的表和字段
 2. 判断涉及的表属于"公开数据"还是"私有数据"
-3. 如果涉及"私有数据"，必须添加基于 `secretary_id={user_id}` 的过滤条件
+3. 如果涉及"私有数据"，必须添加基于 `secretary_id=<当前用户ID>` 的过滤条件
 4. 生成符合PostgreSQL语法的SELECT查询
 5. 使用run_sql工具返回SQL，如果有越权请求，填写 `permission_warning` 字段
 
@@ -103,34 +121,33 @@ def generate_sql_query_prompt(user_id: int = None) -> Dict[str, Any]:
     permission_warning="根据权限规则，您只能查看自己创建的任务。已为您过滤显示本人的任务数据。"
 )
 """
+    return system_prompt
+
 
-    # 定义工具（Tool Calling）
-    tools = [
+@lru_cache(maxsize=1024)
+def _system_prompt(user_id: Optional[int]) -> str:
+    """完整系统提示词（公共前缀 + 当前用户ID），按用户ID缓存"""
+    system_prompt = _static_prompt(user_id is not None)
+    if user_id is not None:
+        system_prompt += f"\n## 当前用户\n当前用户的ID (secretary_id) 为: {user_id}\n"
+    return system_prompt
+
+
+def generate_sql_query_prompt(user_id: int = None) -> Dict[str, Any]:
+    """生成SQL查询的Prompt和工具定义
+    
+    Args:
+        user_id: 当前用户的ID（secretary表的主键），用于权限控制
+        
+    Returns:
         {
-            "type": "function",
-            "function": {
-                "name": "run_sql",
-                "description": "执行SQL查询并返回结果",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "sql": {
-                            "type": "string",
-                            "description": "要执行的SQL SELECT查询语句"
-                        },
-                        "permission_warning": {
-                            "type": "string",
-                            "description": "如果用户的请求超出了权限范围（例如请求查看他人的私有数据），在此字段中说明原因。如果未越权，则留空。"
-                        }
-                    },
-                    "required": ["sql"]
-                }
-            }
+            "system_prompt": str,        # 系统提示词
+            "tools": List[Dict],          # 工具定义（Tool Calling）
+            "allowed_tables": Tuple[str]  # 允许查询的表名列表
         }
-    ]
-    
+    """
     return {
-        "system_prompt": system_prompt,
-        "tools": tools,
-        "allowed_tables": allowed_tables
+        "system_prompt": _system_prompt(user_id),
+        "tools": _SQL_QUERY_TOOLS,
+        "allowed_tables": get_table_names()
     }
@@ -1,71 +1,54 @@
 """
 Schema Loader
-负责加载和缓存数据库Schema文件内容
+负责加载数据库Schema文件内容（导入时读取一次，进程内只读共享）
 """
 from pathlib import Path
 import re
-from typing import List, Optional
+from typing import Tuple
 
-class SchemaLoader:
-    _instance = None
-    _schema_text: Optional[str] = None
-    _table_names: Optional[List[str]] = None
-    
-    # 数据库Schema文件路径 (相对于当前文件)
-    # 由于 schema_loader.py 和 database.md 都在 sql_query 目录下
-    SCHEMA_FILE_PATH = Path(__file__).parent / "database.md"
+# 数据库Schema文件路径 (相对于当前文件)
+# 由于 schema_loader.py 和 database.md 都在 sql_query 目录下
+SCHEMA_FILE_PATH = Path(__file__).parent / "database.md"
+
+# 表名匹配规则（导入时编译一次，合并为一个正则，Schema文本只扫描一遍）
+_TABLE_NAME_RE = re.compile(
+    # 备选格式，以防格式变化: ### 表名: xxx
+    r'###\s*表名[:：]\s*`?(\w+)`?'
+    # ## xxx 表
+    r'|##\s+(\w+)\s*表'
+    # CREATE TABLE xxx（不区分大小写）
+    r'|(?i:CREATE TABLE)\s+`?(\w+)`?'
+    # 匹配格式: # 1. department（院系）
+    r'|#\s*\d+\.\s*(\w+)'
+)
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(SchemaLoader, cls).__new__(cls)
-        return cls._instance
 
-    def load_schema(self) -> str:
-        """加载数据库Schema内容（带缓存）"""
-        if self._schema_text is None:
-            self._schema_text = self._read_schema_file()
-        return self._schema_text
+def _read_schema_file() -> str:
+    """读取Schema文件内容"""
+    if not SCHEMA_FILE_PATH.exists():            
+        return "## 数据库Schema未找到\n请确保database.md文件存在"
+    
+    try:
+        return SCHEMA_FILE_PATH.read_text(encoding="utf-8")
+    except Exception as e:
+        return f"## 读取数据库Schema失败\n错误: {str(e)}"
 
-    def get_table_names(self) -> List[str]:
-        """获取所有表名列表（带缓存）"""
-        if self._table_names is None:
-            schema_text = self.load_schema()
-            self._table_names = self._extract_table_names(schema_text)
-        return self._table_names
+def _extract_table_names(schema_text: str) -> Tuple[str, ...]:
+    """从Schema文本中提取表名列表"""
+    tables = set()
+    for match in _TABLE_NAME_RE.finditer(schema_text):
+        tables.update(name for name in match.groups() if name)
+    
+    return tuple(sorted(tables))
 
-    def _read_schema_file(self) -> str:
-        """读取Schema文件内容"""
-        if not self.SCHEMA_FILE_PATH.exists():            
-            return "## 数据库Schema未找到\n请确保database.md文件存在"
-        
-        try:
-            return self.SCHEMA_FILE_PATH.read_text(encoding="utf-8")
-        except Exception as e:
-            return f"## 读取数据库Schema失败\n错误: {str(e)}"
+# database.md 在进程生命周期内不变，导入时读取并解析一次
+_SCHEMA_TEXT = _read_schema_file()
+_TABLE_NAMES = _extract_table_names(_SCHEMA_TEXT)
 
-    def _extract_table_names(self, schema_text: str) -> List[str]:
-        """从Schema文本中提取表名列表"""
-        tables = set()
-        
-        # 匹配格式: # 1. department（院系）
-        # 这里的正则需要匹配: # 数字. 表名(中文说明)
-        pattern = r'#\s*\d+\.\s*(\w+)'
-        tables.update(re.findall(pattern, schema_text))
-        
-        # 也可以保留之前的匹配逻辑作为备选，以防格式变化
-        # 匹配 ### 表名: xxx
-        pattern1 = r'###\s*表名[:：]\s*`?(\w+)`?'
-        tables.update(re.findall(pattern1, schema_text))
-        
-        # 匹配 ## xxx 表
-        pattern2 = r'##\s+(\w+)\s*表'
-        tables.update(re.findall(pattern2, schema_text))
-        
-        # 匹配 CREATE TABLE xxx
-        pattern3 = r'CREATE TABLE\s+`?(\w+)`?'
-        tables.update(re.findall(pattern3, schema_text, re.IGNORECASE))
-        
-        return sorted(list(tables))
+def load_schema() -> str:
+    """数据库Schema内容"""
+    return _SCHEMA_TEXT
 
-# 全局单例实例
-schema_loader = SchemaLoader()
+def get_table_names() -> Tuple[str, ...]:
+    """所有表名（已排序）"""
+    return _TABLE_NAMES
@@ -8,6 +8,9 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from ...database.db_config import get_session_factory
 
+# 服务端游标每次从数据库拉取的行数
+STREAM_BATCH_SIZE = 1000
+
 
 class SQLExecutor:
     """SQL执行器
@@ -42,18 +45,20 @@ class SQLExecutor:
         """
         db = self.SessionLocal()
         try:
-            # 执行查询
-            result = db.execute(text(sql))
+            # 执行查询：使用服务端游标分批拉取，避免驱动一次性缓存整个大结果集
+            result = db.execute(
+                text(sql).execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+            )
             
-            # 获取结果
-            rows = result.fetchall()
+            # 获取结果（Row 在数据库层一次性转为 tuple，上层可直接序列化）
+            rows = [tuple(row) for row in result]
             columns = list(result.keys())
             
             return {
                 "status": "success",
                 "data": {
                     "sql": sql,
-                    "rows": [tuple(row) for row in rows],
+                    "rows": rows,
                     "columns": columns,
                     "row_count": len(rows)
                 }
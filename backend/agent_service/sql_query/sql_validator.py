@@ -2,6 +2,8 @@
 SQL Validator - SQL安全校验器
 使用sqlglot进行专业的SQL解析和安全检查
 """
+import re
+from functools import lru_cache
 from typing import Tuple, List
 
 try:
@@ -10,7 +12,23 @@ try:
     SQLGLOT_AVAILABLE = True
 except ImportError:
     SQLGLOT_AVAILABLE = False
-    import re
+
+# 危险函数（子串匹配，不区分大小写；一次扫描，无需生成大写副本）
+_DANGEROUS_FUNCTION_RE = re.compile(r"PG_SLEEP|PG_READ_FILE|PG_WRITE_FILE|PG_LS_DIR", re.IGNORECASE)
+
+# 降级方案中的危险关键字（按整词匹配，created_at/updated_at 等列名不会误判）
+_DANGEROUS_KEYWORD_RE = re.compile(r"\b(?:DROP|DELETE|UPDATE|INSERT|ALTER|CREATE|TRUNCATE)\b", re.IGNORECASE)
+
+
+# 语句的首个关键字（以注释或括号开头时不匹配，交给sqlglot判断）
+_LEADING_KEYWORD_RE = re.compile(r"\s*([A-Za-z]+)")
+_QUERY_KEYWORDS = frozenset({"SELECT", "WITH"})
+
+
+@lru_cache(maxsize=512)
+def _parse_cached(sql: str, dialect: str):
+    """解析SQL（按SQL文本缓存；返回的AST在校验中只读遍历，可安全复用）"""
+    return parse_one(sql, dialect=dialect)
 
 
 class SQLValidator:
@@ -50,30 +68,34 @@ class SQLValidator:
     
     def _validate_with_sqlglot(self, sql: str, allowed_tables: List[str]) -> Tuple[bool, str]:
         """使用sqlglot进行专业校验"""
+        # 快速预检：明显不合法的SQL无需进入解析器
+        # 1. 检查是否只有一条语句
+        if ";" in sql.rstrip(";"):
+            return False, "不允许多条SQL语句"
+        
+        lead = _LEADING_KEYWORD_RE.match(sql)
+        if lead and lead.group(1).upper() not in _QUERY_KEYWORDS:
+            return False, f"仅允许SELECT查询，当前语句以 {lead.group(1).upper()} 开头"
+        
         try:
             # 解析SQL
-            parsed = parse_one(sql, dialect=self.dialect)
-            
-            # 1. 检查是否只有一条语句
-            if ";" in sql.rstrip(";"):
-                return False, "不允许多条SQL语句"
+            parsed = _parse_cached(sql, self.dialect)
             
             # 2. 检查是否为SELECT语句
             if not isinstance(parsed, exp.Select):
                 return False, f"仅允许SELECT查询，当前类型: {type(parsed).__name__}"
             
             # 3. 检查表名是否在白名单内
-            tables = [table.name for table in parsed.find_all(exp.Table)]
-            for table in tables:
-                if table not in allowed_tables:
+            allowed = frozenset(allowed_tables)
+            for table in parsed.find_all(exp.Table):
+                table = table.name
+                if table not in allowed:
                     return False, f"表 '{table}' 不在允许查询的范围内。允许的表: {', '.join(allowed_tables)}"
             
             # 4. 检查是否包含危险函数（简单的字符串检查）
-            sql_upper = sql.upper()
-            dangerous_functions = ["PG_SLEEP", "PG_READ_FILE", "PG_WRITE_FILE", "PG_LS_DIR"]
-            for func in dangerous_functions:
-                if func in sql_upper:
-                    return False, f"禁止使用危险函数: {func.lower()}"
+            match = _DANGEROUS_FUNCTION_RE.search(sql)
+            if match:
+                return False, f"禁止使用危险函数: {match.group(0).lower()}"
             
             return True, "OK"
             
@@ -82,26 +104,23 @@ class SQLValidator:
     
     def _validate_with_regex(self, sql: str, allowed_tables: List[str]) -> Tuple[bool, str]:
         """降级方案：使用正则表达式进行简单校验"""
-        sql_upper = sql.upper()
-        
         # 1. 检查多语句
         if sql.count(";") > 1:
             return False, "不允许多条SQL语句"
         
         # 2. 检查是否为SELECT
-        if not sql_upper.strip().startswith("SELECT"):
+        lead = _LEADING_KEYWORD_RE.match(sql)
+        if not lead or lead.group(1).upper() != "SELECT":
             return False, "仅允许SELECT查询"
         
         # 3. 检查危险关键字
-        dangerous_keywords = ["DROP", "DELETE", "UPDATE", "INSERT", "ALTER", "CREATE", "TRUNCATE"]
-        for keyword in dangerous_keywords:
-            if keyword in sql_upper:
-                return False, f"禁止使用关键字: {keyword}"
+        match = _DANGEROUS_KEYWORD_RE.search(sql)
+        if match:
+            return False, f"禁止使用关键字: {match.group(0).upper()}"
         
         # 4. 检查危险函数
-        dangerous_functions = ["PG_SLEEP", "PG_READ_FILE", "PG_WRITE_FILE"]
-        for func in dangerous_functions:
-            if func in sql_upper:
-                return False, f"禁止使用危险函数: {func}"
+        match = _DANGEROUS_FUNCTION_RE.search(sql)
+        if match:
+            return False, f"禁止使用危险函数: {match.group(0).upper()}"
         
         return True, "OK"
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, func, update, delete
 from sqlalchemy.orm import Session
 from typing import List, Optional, Any, Union, Dict
 from pydantic import BaseModel, field_validator
 from datetime import datetime
-import json
+import orjson
 
 from backend.database.db_config import get_db_session
 from backend.database.models import ChatSession, SessionMessage, Secretary
@@ -17,6 +20,12 @@ logger = get_logger(__name__)
 
 router = APIRouter()
 
+
+def _dump_content(content: Dict[str, Any]) -> str:
+    """Serialize a dumped AgentResponse for storage (Decimal and other non-JSON values as strings)."""
+    return orjson.dumps(content, default=str).decode()
+
+
 # Pydantic Models
 class SessionCreate(BaseModel):
     title: Optional[str] = "新对话"
@@ -35,14 +44,14 @@ class MessageResponse(BaseModel):
 
     @field_validator('content', mode='before')
     def parse_content(cls, v):
-        if isinstance(v, str):
-            # 尝试解析JSON字符串
-            # 我们的结构化响应是一个包含 "items" 键的 JSON 对象
+        # 我们的结构化响应是一个包含 "items" 键的 JSON 对象；
+        # 用户输入等普通文本不以 "{" 开头，无需尝试解析
+        if isinstance(v, str) and v.startswith("{"):
             try:
-                parsed = json.loads(v)
+                parsed = orjson.loads(v)
                 if isinstance(parsed, dict) and "items" in parsed:
                     return parsed
-            except (json.JSONDecodeError, TypeError):
+            except orjson.JSONDecodeError:
                 pass
         return v
 
@@ -70,9 +79,9 @@ def create_session(
     title = session_in.title
     if title == "新对话":
         # 查询当前用户的会话数量
-        count = db.query(ChatSession).filter(
-            ChatSession.secretary_id == current_user.id
-        ).count()
+        count = db.execute(
+            select(func.count(ChatSession.id)).where(ChatSession.secretary_id == current_user.id)
+        ).scalar_one()
         title = f"新对话{count + 1}"
 
     new_session = ChatSession(
@@ -90,9 +99,12 @@ def list_sessions(
     current_user: Secretary = Depends(get_current_user)
 ):
     """获取当前用户的所有会话列表"""
-    sessions = db.query(ChatSession).filter(
-        ChatSession.secretary_id == current_user.id
-    ).order_by(ChatSession.updated_at.desc()).all()
+    # 只查询响应需要的列，不构建ORM实体
+    sessions = db.execute(
+        select(ChatSession.id, ChatSession.title, ChatSession.created_at, ChatSession.updated_at)
+        .where(ChatSession.secretary_id == current_user.id)
+        .order_by(ChatSession.updated_at.desc())
+    ).all()
     return sessions
 
 @router.get("/sessions/{session_id}/messages", response_model=List[MessageResponse])
@@ -102,22 +114,64 @@ def get_messages(
     current_user: Secretary = Depends(get_current_user)
 ):
     """获取指定会话的所有消息"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.secretary_id == current_user.id
-    ).first()
-    if not session:
+    if not _owns_session(db, session_id, current_user.id):
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # 按时间正序排列消息
-    messages = db.query(SessionMessage).filter(
-        SessionMessage.session_id == session.id
-    ).order_by(SessionMessage.created_at.asc()).all()
+    # 按时间正序排列消息（只查询响应需要的列）
+    messages = db.execute(
+        select(SessionMessage.id, SessionMessage.role, SessionMessage.content, SessionMessage.created_at)
+        .where(SessionMessage.session_id == session_id)
+        .order_by(SessionMessage.created_at.asc())
+    ).all()
     
     return messages
 
-@router.post("/sessions/{session_id}/messages", response_model=MessageResponse)
-def send_message(
+def _owns_session(db: Session, session_id: int, secretary_id: int) -> bool:
+    """会话是否存在且属于该用户（只查询主键）"""
+    return db.execute(
+        select(ChatSession.id).where(
+            ChatSession.id == session_id,
+            ChatSession.secretary_id == secretary_id
+        )
+    ).first() is not None
+
+def _save_user_message(db: Session, session_id: int, secretary_id: int, content: str):
+    """校验会话归属并保存用户消息（同步DB操作，在线程池中执行）"""
+    if not _owns_session(db, session_id, secretary_id):
+        logger.warning(f"会话不存在或无权访问: session_id={session_id}")
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    user_msg = SessionMessage(
+        session_id=session_id,
+        role="user",
+        content=content
+    )
+    db.add(user_msg)
+    db.commit() # Commit user message first so it's saved even if agent fails
+
+def _save_assistant_message(db: Session, session_id: int, content: str) -> SessionMessage:
+    """保存助手消息并更新会话时间（同步DB操作，在线程池中执行）"""
+    assistant_msg = SessionMessage(
+        session_id=session_id,
+        role="assistant",
+        content=content
+    )
+    db.add(assistant_msg)
+    
+    # Update session timestamp (single UPDATE, no need to load the session)
+    db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == session_id)
+        .values(updated_at=get_utc_now())
+        .execution_options(synchronize_session=False)
+    )
+    
+    db.commit()
+    db.refresh(assistant_msg)
+    return assistant_msg
+
+@router.post("/sessions/{session_id}/messages", response_model=MessageResponse, response_class=ORJSONResponse)
+async def send_message(
     session_id: int,
     message_in: MessageCreate,
     db: Session = Depends(get_db_session),
@@ -126,39 +180,29 @@ def send_message(
     """发送消息给Agent并获取回复"""
     logger.info(f"收到发送消息请求: session_id={session_id}, content={message_in.content}")
     
-    # 1. Verify session ownership
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.secretary_id == current_user.id
-    ).first()
-    if not session:
-        logger.warning(f"会话不存在或无权访问: session_id={session_id}")
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    # 2. Save user message
-    user_msg = SessionMessage(
-        session_id=session.id,
-        role="user",
-        content=message_in.content
+    # 1. Verify session ownership & save user message
+    await run_in_threadpool(
+        _save_user_message, db, session_id, current_user.id, message_in.content
     )
-    db.add(user_msg)
-    db.commit() # Commit user message first so it's saved even if agent fails
     
-    # 3. Call Agent Service
+    # 2. Call Agent Service (awaited on the event loop, no worker thread held)
     try:
         logger.info("正在调用 Agent Service 处理请求...")
         # Pass user_id for permission control
-        agent_response = process_user_query(
+        agent_response = await process_user_query(
             user_input=message_in.content,
             user_id=current_user.id
         )
         
         # Serialize AgentResponse to JSON string for storage
         if isinstance(agent_response, AgentResponse):
-            agent_response_text = agent_response.model_dump_json()
+            # Dump once; the stored JSON is serialized from the same dict
+            response_content = agent_response.model_dump()
+            agent_response_text = _dump_content(response_content)
         else:
             # Fallback if it returns string (should not happen with new code)
             agent_response_text = str(agent_response)
+            response_content = agent_response_text
             
         logger.info("Agent Service 处理完成")
     except Exception as e:
@@ -167,23 +211,19 @@ def send_message(
         error_response = AgentResponse(items=[
             {"format": "text", "content": f"处理请求时发生错误: {str(e)}"}
         ])
-        agent_response_text = error_response.model_dump_json()
+        response_content = error_response.model_dump()
+        agent_response_text = _dump_content(response_content)
     
-    # 4. Save assistant message
-    assistant_msg = SessionMessage(
-        session_id=session.id,
-        role="assistant",
-        content=agent_response_text
+    # 3. Save assistant message & update session timestamp
+    assistant_msg = await run_in_threadpool(_save_assistant_message, db, session_id, agent_response_text)
+
+    # Build the reply from the in-memory response instead of re-parsing the stored JSON
+    return MessageResponse(
+        id=assistant_msg.id,
+        role=assistant_msg.role,
+        content=response_content,
+        created_at=assistant_msg.created_at
     )
-    db.add(assistant_msg)
-    
-    # 5. Update session timestamp
-    session.updated_at = get_utc_now()
-    
-    db.commit()
-    db.refresh(assistant_msg)
-    
-    return assistant_msg
 
 @router.delete("/sessions/{session_id}")
 def delete_session(
@@ -192,14 +232,24 @@ def delete_session(
     current_user: Secretary = Depends(get_current_user)
 ):
     """删除会话"""
-    session = db.query(ChatSession).filter(
+    owned = select(ChatSession.id).where(
         ChatSession.id == session_id,
         ChatSession.secretary_id == current_user.id
-    ).first()
-    if not session:
+    )
+    # 直接执行带归属条件的DELETE语句，不先查询再删除（外键无级联，先删消息）
+    db.execute(
+        delete(SessionMessage)
+        .where(SessionMessage.session_id.in_(owned))
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(
+        delete(ChatSession)
+        .where(ChatSession.id == session_id, ChatSession.secretary_id == current_user.id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    db.delete(session)
     db.commit()
     return {"status": "success"}
 
@@ -211,14 +261,17 @@ def update_session(
     current_user: Secretary = Depends(get_current_user)
 ):
     """更新会话标题"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.secretary_id == current_user.id
+    # 单条带归属条件的UPDATE，RETURNING 直接取回响应所需的列
+    session = db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == session_id, ChatSession.secretary_id == current_user.id)
+        .values(title=session_in.title)
+        .returning(ChatSession.id, ChatSession.title, ChatSession.created_at, ChatSession.updated_at)
+        .execution_options(synchronize_session=False)
     ).first()
     if not session:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session.title = session_in.title
     db.commit()
-    db.refresh(session)
     return session
@@ -2,9 +2,11 @@
 已汇总表单 API
 提供汇总表的查询、下载等功能
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timezone
+import base64
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from backend.utils import ensure_utc
@@ -12,8 +14,8 @@ from backend.utils import ensure_utc
 from backend.database.db_config import get_db_session
 from backend.database.models import Aggregation, CollectTask, Secretary, FieldValidationRecord, Teacher
 from backend.api.auth import get_current_user
+from backend.api.files import stream_file_response
 import os
-import tempfile
 
 router = APIRouter()
 
@@ -39,7 +41,8 @@ class AggregationListResponse(BaseModel):
     """汇总表列表响应"""
     success: bool
     data: List[AggregationItem]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
     message: Optional[str] = None
 
 
@@ -51,6 +54,24 @@ class AggregationDownloadResponse(BaseModel):
     message: Optional[str] = None
 
 
+# ===================== Cursor Helpers =====================
+
+def _encode_cursor(generated_at: datetime, aggregation_id: int) -> str:
+    """将最后一行的 (generated_at, id) 编码为翻页游标"""
+    raw = f"{ensure_utc(generated_at).isoformat()}|{aggregation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析翻页游标，格式不合法时抛出400"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        generated_at, aggregation_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(generated_at), int(aggregation_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="无效的翻页游标")
+
+
 # ===================== API Endpoints =====================
 
 @router.get("/list")
@@ -63,6 +84,8 @@ def get_aggregation_list(
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     sort_by: str = Query("generated_at", description="排序字段: generated_at, task_name"),
     sort_order: str = Query("desc", description="排序顺序: asc, desc"),
+    include_total: bool = Query(True, description="是否返回总数（只需当前页时可关闭以省去计数查询）"),
+    cursor: Optional[str] = Query(None, description="翻页游标（上一页返回的 next_cursor，仅按 generated_at 排序时可用，传入时忽略 page）"),
     current_secretary: Secretary = Depends(get_current_user),
     db: Session = Depends(get_db_session)
 ):
@@ -72,13 +95,19 @@ def get_aggregation_list(
     - 支持按时间范围过滤
     - 支持分页
     - 支持排序
+    - include_total=false 时不计算总数，total 返回 None
+    - 按 generated_at 排序时返回 next_cursor，传回 cursor 即按 (generated_at, id) 定位下一页，无需 OFFSET 扫描
     """
+    keyset = sort_by != "task_name"
+    if cursor and not keyset:
+        raise HTTPException(status_code=400, detail="按任务名称排序时不支持游标翻页")
+    after = _decode_cursor(cursor) if cursor else None
+    
     try:
         # 基础查询：仅查询当前教秘生成的汇总表
         query = db.query(Aggregation).filter(
             Aggregation.generated_by == current_secretary.id
         )
-        joined_task = False
         
         # 过滤条件
         if task_id:
@@ -86,7 +115,6 @@ def get_aggregation_list(
         
         if task_name:
             query = query.join(CollectTask, Aggregation.task_id == CollectTask.id)
-            joined_task = True
             query = query.filter(CollectTask.name.ilike(f"%{task_name}%"))
         
         if start_date:
@@ -103,38 +131,44 @@ def get_aggregation_list(
             except ValueError:
                 pass
         
-        # 获取总数
-        total = query.count()
+        # 获取总数（仅按名称过滤时才带 CollectTask 连接）
+        total = query.with_entities(func.count(Aggregation.id)).scalar() if include_total else None
+        
+        # 同一条查询带出任务名称，避免逐行查询 CollectTask；CollectTask 只连接一次
+        if not task_name:
+            query = query.join(CollectTask, Aggregation.task_id == CollectTask.id, isouter=True)
+        query = query.add_columns(CollectTask.name.label("task_name"))
         
         # 排序
         if sort_by == "task_name":
-            # 需要 join CollectTask 表
-            if not joined_task:
-                query = query.join(CollectTask, Aggregation.task_id == CollectTask.id)
-                joined_task = True
             if sort_order == "asc":
                 query = query.order_by(CollectTask.name.asc())
             else:
                 query = query.order_by(CollectTask.name.desc())
-        else:  # 默认按 generated_at 排序
+        else:  # 默认按 generated_at 排序，id 作为并列时的次序（游标翻页依赖该次序唯一）
+            position = tuple_(Aggregation.generated_at, Aggregation.id)
             if sort_order == "asc":
-                query = query.order_by(Aggregation.generated_at.asc())
+                if after:
+                    query = query.filter(position > tuple_(*after))
+                query = query.order_by(Aggregation.generated_at.asc(), Aggregation.id.asc())
             else:
-                query = query.order_by(Aggregation.generated_at.desc())
+                if after:
+                    query = query.filter(position < tuple_(*after))
+                query = query.order_by(Aggregation.generated_at.desc(), Aggregation.id.desc())
         
-        # 分页
-        offset = (page - 1) * page_size
-        aggregations = query.offset(offset).limit(page_size).all()
+        # 分页：有游标时直接从游标位置取，否则按页码偏移
+        if not after:
+            query = query.offset((page - 1) * page_size)
+        rows = query.limit(page_size).all()
         
         # 构建返回数据
         items = []
-        for agg in aggregations:
-            task = db.query(CollectTask).filter(CollectTask.id == agg.task_id).first()
+        for agg, agg_task_name in rows:
             items.append({
                 "id": agg.id,
                 "name": agg.name,
                 "task_id": agg.task_id,
-                "task_name": task.name if task else "未知任务",
+                "task_name": agg_task_name or "未知任务",
                 "generated_at": ensure_utc(agg.generated_at),
                 "record_count": agg.record_count,
                 "file_path": agg.file_path,
@@ -142,9 +176,15 @@ def get_aggregation_list(
             })
         
         # 返回数据和总数（CommonAPI会自动包装success: true）
+        next_cursor = None
+        if keyset and len(rows) == page_size:
+            last = rows[-1][0]
+            next_cursor = _encode_cursor(last.generated_at, last.id)
+        
         return {
             "data": items,
-            "total": total
+            "total": total,
+            "next_cursor": next_cursor
         }
     
     except Exception as e:
@@ -177,29 +217,15 @@ def download_aggregation(
         # file_path 格式: minio://mailmerge/aggregation/{id}/filename.xlsx
         source_path = agg.file_path
         
-        # 创建临时文件
-        original_filename = os.path.basename(source_path)
-        file_extension = os.path.splitext(original_filename)[1]  # 获取文件扩展名 .xlsx
-        temp_dir = tempfile.gettempdir()
-        local_file_path = os.path.join(temp_dir, f"agg_{aggregation_id}_{original_filename}")
-        
-        # 下载到本地临时文件
-        from backend.storage_service import download
-        downloaded_path = download(source_path, local_file_path)
-        
         # 使用原始文件名作为下载文件名，以便用户区分不同版本
         # 这样用户可以看到文件名中的时间戳变化，确认是重新导出的文件
-        download_filename = original_filename
-        
-        # 返回文件下载响应
-        from fastapi.responses import FileResponse
+        download_filename = os.path.basename(source_path)
         
-        # 让 FastAPI/Starlette 自动处理 Content-Disposition 头
-        # 它会自动处理 UTF-8 文件名 (filename*=utf-8''...)
-        return FileResponse(
-            path=downloaded_path,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            filename=download_filename
+        # 直接从存储服务流式返回，不落地临时文件（UTF-8 文件名按 filename*=utf-8''... 处理）
+        return stream_file_response(
+            source_path,
+            download_filename,
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
     
     except HTTPException:
@@ -3,19 +3,21 @@
 处理用户登录、注册、登出等操作
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-import hashlib
+from typing import Any, Dict, Optional, Tuple
 import jwt
 from datetime import datetime, timedelta
 import os
 from backend.utils import get_utc_now
 from backend.utils.encryption import encrypt_value
+from backend.utils.cache_utils import ttl_cache
+from backend.utils.passwords import hash_password, verify_password, password_needs_rehash
 
-from backend.database.db_config import get_db_session
+from backend.database.db_config import get_db_session, get_session_factory
 from backend.database.models import Secretary, Department
 
 router = APIRouter()
@@ -26,6 +28,14 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24小时
 
+# get_current_user 缓存“用户存在”及不可变字段的时间（秒）；资料等可变字段不缓存，使用时实时读取
+USER_CACHE_TTL = 60
+
+# 院系列表只在初始化数据时写入，进程内与浏览器端都缓存一小时
+DEPARTMENT_CACHE_TTL = 3600
+
+SessionLocal = get_session_factory()
+
 
 # ==================== Pydantic 模型 ====================
 
@@ -68,14 +78,25 @@ class DepartmentResponse(BaseModel):
 
 # ==================== 工具函数 ====================
 
-def hash_password(password: str) -> str:
-    """密码哈希"""
-    return hashlib.sha256(password.encode()).hexdigest()
+@ttl_cache(ttl=USER_CACHE_TTL, maxsize=10000)
+def _load_user_identity(user_id: int) -> Optional[Dict[str, Any]]:
+    """读取教秘的不可变字段（id、department_id；用户不存在时返回None），按用户ID缓存"""
+    db = SessionLocal()
+    try:
+        row = db.query(Secretary.id, Secretary.department_id).filter(Secretary.id == user_id).first()
+        return dict(row._mapping) if row else None
+    finally:
+        db.close()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return hash_password(plain_password) == hashed_password
+@ttl_cache(ttl=DEPARTMENT_CACHE_TTL, maxsize=1)
+def _load_departments() -> Tuple[Tuple[int, str], ...]:
+    """读取全部院系的 (id, name)"""
+    db = SessionLocal()
+    try:
+        return tuple(db.query(Department.id, Department.name).all())
+    finally:
+        db.close()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -112,13 +133,18 @@ def get_current_user(
             detail="无效的认证凭证"
         )
     
-    user = db.query(Secretary).filter(Secretary.id == user_id).first()
-    if user is None:
+    identity = _load_user_identity(user_id)
+    if identity is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户不存在"
         )
-    return user
+    
+    # 由缓存的不可变字段构造每个请求独立的实例，以已持久化状态并入本次会话（load=False 不查询数据库）；
+    # 其余字段处于过期状态，首次访问时从数据库读取最新值，只用 id 的接口不产生额外查询
+    user = Secretary(**identity)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
 
 
 # ==================== API 路由 ====================
@@ -147,13 +173,18 @@ async def login(request: LoginRequest, db: Session = Depends(get_db_session)):
             detail="账号或密码错误"
         )
     
-    # 验证密码
-    if not verify_password(request.password, user.password_hash):
+    # 验证密码（argon2 计算较慢，放到线程池中执行，不阻塞事件循环）
+    if not await run_in_threadpool(verify_password, request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="账号或密码错误"
         )
     
+    # 旧版哈希在登录成功后升级为 argon2id
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = await run_in_threadpool(hash_password, request.password)
+        db.commit()
+    
     # 创建 token（sub 必须是字符串）
     access_token = create_access_token(data={"sub": str(user.id)})
     
@@ -181,37 +212,32 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db_sessio
     用户注册
     创建新的 Secretary 记录
     """
-    # 检查工号是否已存在
-    existing_id = db.query(Secretary).filter(Secretary.id == request.employee_id).first()
-    if existing_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="工号已被注册"
-        )
-    
-    # 检查用户名是否已存在
-    existing_username = db.query(Secretary).filter(Secretary.username == request.username).first()
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="用户名已存在"
-        )
-    
-    # 检查账号是否已存在（使用用户名作为账号）
-    existing_account = db.query(Secretary).filter(Secretary.account == request.username).first()
-    if existing_account:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="账号已存在"
-        )
+    from sqlalchemy import or_
     
-    # 检查邮箱是否已存在（如果提供了邮箱）
+    # 一次查询取出与工号/用户名/账号/邮箱冲突的已有用户（账号使用用户名）
+    conditions = [
+        Secretary.id == request.employee_id,
+        Secretary.username == request.username,
+        Secretary.account == request.username
+    ]
     if request.email:
-        existing_email = db.query(Secretary).filter(Secretary.email == request.email).first()
-        if existing_email:
+        conditions.append(Secretary.email == request.email)
+    conflicts = db.query(
+        Secretary.id, Secretary.username, Secretary.account, Secretary.email
+    ).filter(or_(*conditions)).all()
+    
+    # 按原有优先级给出具体的冲突原因
+    checks = [
+        (lambda row: row.id == request.employee_id, "工号已被注册"),
+        (lambda row: row.username == request.username, "用户名已存在"),
+        (lambda row: row.account == request.username, "账号已存在"),
+        (lambda row: bool(request.email) and row.email == request.email, "邮箱已被注册"),
+    ]
+    for matches, detail in checks:
+        if any(matches(row) for row in conflicts):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="邮箱已被注册"
+                detail=detail
             )
     
     # 验证院系是否存在
@@ -229,7 +255,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db_sessio
         department_id=request.department_id,
         username=request.username,
         account=request.username,  # 使用用户名作为账号
-        password_hash=hash_password(request.password),
+        password_hash=await run_in_threadpool(hash_password, request.password),
         email=request.email,
         mail_auth_code=encrypt_value(request.mail_auth_code),
         phone=request.phone
@@ -253,15 +279,15 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db_sessio
 
 
 @router.get("/departments", response_model=list[DepartmentResponse])
-async def get_departments(db: Session = Depends(get_db_session)):
+def get_departments(response: Response):
     """
     获取所有院系列表
     用于注册页面的下拉选择
     """
-    departments = db.query(Department).all()
+    response.headers["Cache-Control"] = f"public, max-age={DEPARTMENT_CACHE_TTL}"
     return [
-        DepartmentResponse(id=dept.id, name=dept.name)
-        for dept in departments
+        DepartmentResponse(id=dept_id, name=name)
+        for dept_id, name in _load_departments()
     ]
 
 
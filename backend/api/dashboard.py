@@ -3,9 +3,9 @@ Dashboard API 路由
 提供首页概览数据统计
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, case, select
 from pydantic import BaseModel
 from typing import Dict, Optional
 
@@ -73,74 +73,58 @@ async def get_dashboard_overview(
     # 获取当前用户 ID
     secretary_id = current_user.id
 
-    # 1. 获取个人信息
-    secretary = db.query(Secretary).filter(Secretary.id == secretary_id).first()
-    if not secretary:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="用户信息不存在"
-        )
-
-    department = db.query(Department).filter(
-        Department.id == secretary.department_id
-    ).first()
+    # 1. 获取个人信息（current_user 即当前教秘记录，只需再取院系名称）
+    department_name = db.query(Department.name).filter(
+        Department.id == current_user.department_id
+    ).scalar()
 
     personal_info = PersonalInfo(
-        name=secretary.name,
-        employee_id=secretary.id,
-        department_name=department.name if department else "未知院系",
-        email=secretary.email,
-        phone=secretary.phone,
-        username=secretary.username,
-        account=secretary.account
+        name=current_user.name,
+        employee_id=current_user.id,
+        department_name=department_name or "未知院系",
+        email=current_user.email,
+        phone=current_user.phone,
+        username=current_user.username,
+        account=current_user.account
     )
 
-    # 2. 获取任务统计
-    task_query = db.query(CollectTask).filter(CollectTask.created_by == secretary_id)
-    
-    total_tasks = task_query.count()
-    draft_tasks = task_query.filter(CollectTask.status == TaskStatus.DRAFT).count()
-    active_tasks = task_query.filter(CollectTask.status == TaskStatus.ACTIVE).count()
-    closed_tasks = task_query.filter(CollectTask.status == TaskStatus.CLOSED).count()
-    aggregated_tasks = task_query.filter(CollectTask.status == TaskStatus.AGGREGATED).count()
-    needs_reaggregation_tasks = task_query.filter(CollectTask.status == TaskStatus.NEEDS_REAGGREGATION).count()
+    # 2. 获取任务统计（按状态分组，一次查询）
+    status_counts = dict(
+        db.query(CollectTask.status, func.count(CollectTask.id))
+        .filter(CollectTask.created_by == secretary_id)
+        .group_by(CollectTask.status)
+        .all()
+    )
 
     task_stats = TaskStats(
-        total=total_tasks,
-        draft=draft_tasks,
-        active=active_tasks,
-        closed=closed_tasks,
-        aggregated=aggregated_tasks,
-        needs_reaggregation=needs_reaggregation_tasks
+        total=sum(status_counts.values()),
+        draft=status_counts.get(TaskStatus.DRAFT, 0),
+        active=status_counts.get(TaskStatus.ACTIVE, 0),
+        closed=status_counts.get(TaskStatus.CLOSED, 0),
+        aggregated=status_counts.get(TaskStatus.AGGREGATED, 0),
+        needs_reaggregation=status_counts.get(TaskStatus.NEEDS_REAGGREGATION, 0)
     )
 
-    # 3. 获取邮件统计
-    sent_total = db.query(SentEmail).filter(
-        SentEmail.from_sec_id == secretary_id
-    ).count()
-
-    received_total = db.query(ReceivedEmail).filter(
-        ReceivedEmail.to_sec_id == secretary_id
-    ).count()
-
-    aggregated = db.query(ReceivedEmail).filter(
-        and_(
-            ReceivedEmail.to_sec_id == secretary_id,
-            ReceivedEmail.is_aggregated == True
-        )
-    ).count()
-
-    not_aggregated = db.query(ReceivedEmail).filter(
-        and_(
-            ReceivedEmail.to_sec_id == secretary_id,
-            ReceivedEmail.is_aggregated == False
-        )
-    ).count()
-
-    # 统计汇总表数量
-    aggregation_count = db.query(Aggregation).filter(
-        Aggregation.generated_by == secretary_id
-    ).count()
+    # 3. 获取邮件统计（收件用条件聚合，发件数与汇总表数量作为标量子查询，一次查询）
+    sent_total_subq = (
+        select(func.count(SentEmail.id))
+        .where(SentEmail.from_sec_id == secretary_id)
+        .scalar_subquery()
+    )
+    aggregation_count_subq = (
+        select(func.count(Aggregation.id))
+        .where(Aggregation.generated_by == secretary_id)
+        .scalar_subquery()
+    )
+    received_total, aggregated, sent_total, aggregation_count = db.query(
+        func.count(ReceivedEmail.id),
+        func.coalesce(func.sum(case((ReceivedEmail.is_aggregated == True, 1), else_=0)), 0),
+        sent_total_subq,
+        aggregation_count_subq
+    ).filter(ReceivedEmail.to_sec_id == secretary_id).one()
+
+    # is_aggregated 非空，未合并数即为差值
+    not_aggregated = received_total - aggregated
 
     email_stats = EmailStats(
         sent_total=sent_total,
@@ -1,19 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from urllib.parse import quote
 import os
-import tempfile
 
 from backend.database.db_config import get_db_session
 from backend.api.auth import get_current_user
 from backend.database.models import SentAttachment, ReceivedAttachment, Secretary
-from backend.storage_service import download
+from backend.storage_service import open_stream
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+
+def stream_file_response(source_path: str, filename: str, media_type: str) -> StreamingResponse:
+    """Stream a stored file to the client as an attachment, without a temp file copy."""
+    quoted = quote(filename)
+    if quoted != filename:
+        disposition = f"attachment; filename*=utf-8''{quoted}"
+    else:
+        disposition = f'attachment; filename="{filename}"'
+    
+    return StreamingResponse(
+        open_stream(source_path),
+        media_type=media_type,
+        headers={"Content-Disposition": disposition}
+    )
+
+
 @router.get("/sent/{attachment_id}")
 def download_sent_attachment(
     attachment_id: int,
@@ -30,18 +46,10 @@ def download_sent_attachment(
         source_path = attachment.file_path
         original_filename = attachment.file_name or os.path.basename(source_path)
         
-        # Create temp file path
-        temp_dir = tempfile.gettempdir()
-        # Use a unique name to avoid conflicts
-        local_file_path = os.path.join(temp_dir, f"sent_{attachment_id}_{original_filename}")
-        
-        # Download using storage service
-        downloaded_path = download(source_path, local_file_path)
-        
-        return FileResponse(
-            path=downloaded_path,
-            filename=original_filename,
-            media_type=attachment.content_type or "application/octet-stream"
+        return stream_file_response(
+            source_path,
+            original_filename,
+            attachment.content_type or "application/octet-stream"
         )
     except Exception as e:
         logger.error(f"Download error: {e}")
@@ -64,17 +72,10 @@ def download_received_attachment(
         source_path = attachment.file_path
         original_filename = attachment.file_name or os.path.basename(source_path)
         
-        # Create temp file path
-        temp_dir = tempfile.gettempdir()
-        local_file_path = os.path.join(temp_dir, f"recv_{attachment_id}_{original_filename}")
-        
-        # Download using storage service
-        downloaded_path = download(source_path, local_file_path)
-        
-        return FileResponse(
-            path=downloaded_path,
-            filename=original_filename,
-            media_type=attachment.content_type or "application/octet-stream"
+        return stream_file_response(
+            source_path,
+            original_filename,
+            attachment.content_type or "application/octet-stream"
         )
     except Exception as e:
         logger.error(f"Download error: {e}")
@@ -4,6 +4,7 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
@@ -11,7 +12,8 @@ import hashlib
 
 from backend.database.db_config import get_db_session
 from backend.database.models import Secretary, Department
-from backend.api.auth import get_current_user, hash_password, verify_password
+from backend.api.auth import get_current_user
+from backend.utils.passwords import hash_password, verify_password
 
 router = APIRouter()
 
@@ -114,7 +116,7 @@ async def change_password(
     """
     try:
         # 验证旧密码
-        if not verify_password(request.old_password, current_user.password_hash):
+        if not await run_in_threadpool(verify_password, request.old_password, current_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="当前密码错误"
@@ -128,7 +130,7 @@ async def change_password(
             )
         
         # 更新密码
-        current_user.password_hash = hash_password(request.new_password)
+        current_user.password_hash = await run_in_threadpool(hash_password, request.new_password)
         
         db.commit()
         
@@ -4,13 +4,15 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from sqlalchemy.orm import Session
 
 from backend.database.db_config import get_db_session
 from backend.database.models import Secretary, Department
-from backend.api.auth import get_current_user, verify_password, hash_password
+from backend.api.auth import get_current_user
+from backend.utils.passwords import verify_password, hash_password
 
 router = APIRouter()
 
@@ -131,7 +133,7 @@ async def change_password(
     修改用户密码
     """
     # 验证旧密码
-    if not verify_password(request.old_password, current_user.password_hash):
+    if not await run_in_threadpool(verify_password, request.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="旧密码错误"
@@ -139,7 +141,7 @@ async def change_password(
     
     try:
         # 更新密码
-        current_user.password_hash = hash_password(request.new_password)
+        current_user.password_hash = await run_in_threadpool(hash_password, request.new_password)
         
         db.commit()
         db.refresh(current_user)
@@ -2,6 +2,8 @@
 Database Configuration Module
 Handles database connection and session management
 """
+from contextlib import contextmanager
+from typing import Tuple
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
@@ -21,9 +23,58 @@ DB_NAME = os.getenv("DB_NAME", "mailmerge")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 
+# Connection pool configuration from environment
+# (for serverless PostgreSQL, lower DB_POOL_RECYCLE to ~300 seconds)
+# DB_MAX_CONNECTIONS is the budget for the whole server (all workers plus the parent
+# process); keep it below PostgreSQL's max_connections (default 100) minus admin/script headroom.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+# Optional explicit per-process pool sizes; derived from DB_MAX_CONNECTIONS when unset
+DB_POOL_SIZE = os.getenv("DB_POOL_SIZE")
+DB_MAX_OVERFLOW = os.getenv("DB_MAX_OVERFLOW")
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "2"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
 # Construct database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Process-wide engine and session factory, created on first use
+_engine = None
+_session_factory = None
+
+
+class _LazySessionMaker(sessionmaker):
+    """
+    sessionmaker bound to the shared engine on the first session, not at creation.
+    
+    Modules create their SessionLocal at import time; deferring the bind keeps those
+    imports from building the pooled engine before app.main() has exported
+    WEB_CONCURRENCY (which get_pool_limits reads).
+    """
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            self.configure(bind=get_shared_engine())
+        return super().__call__(**local_kw)
+
+
+def get_pool_limits() -> Tuple[int, int]:
+    """
+    Per-process (pool_size, max_overflow).
+    
+    Explicit DB_POOL_SIZE / DB_MAX_OVERFLOW win. Otherwise DB_MAX_CONNECTIONS is split
+    evenly between the WEB_CONCURRENCY workers and the parent process (which runs the
+    scheduler), half as persistent pool and half as overflow.
+    Read when the shared engine is created on first use (see _LazySessionMaker), which
+    is after app.main() has exported WEB_CONCURRENCY to itself and the workers.
+    """
+    processes = max(int(os.getenv("WEB_CONCURRENCY") or 1), 1) + 1
+    per_process = max(DB_MAX_CONNECTIONS // processes, 2)
+    pool_size = int(DB_POOL_SIZE) if DB_POOL_SIZE else max(per_process // 2, 1)
+    max_overflow = int(DB_MAX_OVERFLOW) if DB_MAX_OVERFLOW else max(per_process - pool_size, 0)
+    return pool_size, max_overflow
+
 
 def get_engine(echo=False, poolclass=None):
     """
@@ -36,33 +87,67 @@ def get_engine(echo=False, poolclass=None):
     Returns:
         SQLAlchemy Engine instance
     """
+    connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if poolclass is not None:
+        return create_engine(
+            DATABASE_URL,
+            echo=echo,
+            poolclass=poolclass,
+            connect_args=connect_args,
+            future=True
+        )
+    pool_size, max_overflow = get_pool_limits()
     return create_engine(
         DATABASE_URL,
         echo=echo,
-        poolclass=poolclass,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args=connect_args,
         future=True
     )
 
 
+def get_shared_engine():
+    """
+    Get or create the process-wide pooled engine.
+    
+    Returns:
+        SQLAlchemy Engine instance shared by all sessions of this process
+    """
+    global _engine
+    if _engine is None:
+        _engine = get_engine()
+    return _engine
+
+
 def get_session_factory(engine=None):
     """
-    Create and return a session factory
+    Return a session factory
     
     Args:
-        engine: SQLAlchemy engine (creates new one if None)
+        engine: SQLAlchemy engine (uses the shared pooled engine if None)
     
     Returns:
-        SessionLocal class for creating sessions
+        SessionLocal class for creating sessions (the shared one binds to the
+        pooled engine lazily, on its first session)
     """
-    if engine is None:
-        engine = get_engine()
+    global _session_factory
+    if engine is not None:
+        return sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=engine
+        )
     
-    SessionLocal = sessionmaker(
-        autocommit=False,
-        autoflush=False,
-        bind=engine
-    )
-    return SessionLocal
+    if _session_factory is None:
+        _session_factory = _LazySessionMaker(
+            autocommit=False,
+            autoflush=False
+        )
+    return _session_factory
 
 
 def get_db_session():
@@ -80,6 +165,26 @@ def get_db_session():
         db.close()
 
 
+@contextmanager
+def session_scope():
+    """
+    Transactional session scope: commits on success, rolls back on error, always closes.
+    
+    Usage:
+        with session_scope() as db:
+            db.add(obj)
+    """
+    db = get_session_factory()()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 def ensure_database_exists():
     """
     Ensure the database exists, create it if it doesn't.
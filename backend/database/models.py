@@ -202,8 +202,8 @@ class CollectTask(Base):
         CheckConstraint('deadline > started_time OR deadline IS NULL OR started_time IS NULL', 
                        name='chk_task_deadline'),
         Index('idx_task_status', 'status'),
-        Index('idx_task_creator', 'created_by'),
-        Index('idx_task_name', 'name'),
+        Index('idx_task_creator', 'created_by', 'status'),  # 按创建者统计各状态任务数
+        Index('idx_task_name', 'name', unique=True),  # 任务名称全局唯一
     )
 
 
@@ -273,7 +273,7 @@ class SentEmail(Base):
 
     __table_args__ = (
         Index('idx_sent_email_task', 'task_id'),
-        Index('idx_sent_email_secretary', 'from_sec_id'),
+        Index('idx_sent_email_secretary', 'from_sec_id', 'sent_at'),  # 按发件人列出并按发送时间排序
         Index('idx_sent_email_teacher', 'to_tea_id'),
         Index('idx_sent_email_sent_at', 'sent_at'),
     )
@@ -329,7 +329,7 @@ class ReceivedEmail(Base):
     __table_args__ = (
         Index('idx_received_email_task', 'task_id'),
         Index('idx_received_email_teacher', 'from_tea_id'),
-        Index('idx_received_email_secretary', 'to_sec_id'),
+        Index('idx_received_email_secretary', 'to_sec_id', 'is_aggregated'),  # 按收件人统计已/未合并邮件
         Index('idx_received_email_received_at', 'received_at'),
     )
 
@@ -359,7 +359,7 @@ class Aggregation(Base):
 
     __table_args__ = (
         Index('idx_aggregation_task', 'task_id'),
-        Index('idx_aggregation_generator', 'generated_by'),
+        Index('idx_aggregation_generator', 'generated_by', 'generated_at', 'id'),  # 按教秘列出并按生成时间翻页
         Index('idx_aggregation_generated_at', 'generated_at'),
     )
 
@@ -420,5 +420,5 @@ class SessionMessage(Base):
     session = relationship("ChatSession", back_populates="messages")
 
     __table_args__ = (
-        Index('idx_session_message_session', 'session_id'),
+        Index('idx_session_message_session', 'session_id', 'created_at'),  # 按会话取消息并按时间排序
     )
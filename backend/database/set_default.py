@@ -9,7 +9,6 @@ import sys
 import os
 from pathlib import Path
 import json
-import hashlib
 from sqlalchemy.pool import NullPool
 from datetime import datetime
 
@@ -25,24 +24,13 @@ from backend.database.db_config import get_engine, get_session_factory
 from backend.storage_service import ensure_minio_running
 from backend.utils import ensure_utc
 from backend.utils.encryption import encrypt_value
+from backend.utils.passwords import hash_password
 from backend.database.db_config import get_engine, get_session_factory
 from backend.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def hash_password(password: str) -> str:
-    """
-    Simple password hashing (use bcrypt in production)
-    
-    Args:
-        password: Plain text password
-    
-    Returns:
-        Hashed password
-    """
-    return hashlib.sha256(password.encode()).hexdigest()
-
 
 def validate_json_structure(data: dict) -> None:
     """
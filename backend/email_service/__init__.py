@@ -3,6 +3,6 @@
 提供邮件发送和接收功能
 """
 
-from .email_service import send_email, fetch_email, EmailService
+from .email_service import send_email, send_email_over, open_smtp, fetch_email, EmailService
 
-__all__ = ["send_email", "fetch_email", "EmailService"]
+__all__ = ["send_email", "send_email_over", "open_smtp", "fetch_email", "EmailService"]
@@ -81,75 +81,51 @@ class EmailService:
             if not all([sender_email, sender_password, receiver_email]):
                 raise ValueError("发送方邮箱、密码和接收方邮箱不能为空")
             
-            # 验证邮件内容格式
-            if not isinstance(email_content, dict):
-                raise ValueError("email_content必须是字典格式")
-            
-            subject = email_content.get("subject", "")
-            body = email_content.get("body", "")
-            attachments = email_content.get("attachments", [])
-            
-            # 创建邮件对象
-            message = MIMEMultipart()
-            message["From"] = sender_email
-            message["To"] = receiver_email
-            message["Subject"] = subject
-            
-            # Generate Message-ID
-            msg_id = make_msgid(domain=sender_email.split('@')[-1])
-            message["Message-ID"] = msg_id
-            
-            # 添加邮件正文
-            message.attach(MIMEText(body, "plain", "utf-8"))
-            
-            # 处理附件
-            if attachments:
-                if not isinstance(attachments, list):
-                    attachments = [attachments]
-                
-                for attachment_path in attachments:
-                    # 验证是否为绝对路径
-                    if not self._validate_absolute_path(attachment_path):
-                        raise ValueError(f"附件路径必须是绝对路径: {attachment_path}")
-                    
-                    # 验证文件是否存在
-                    if not os.path.exists(attachment_path):
-                        raise FileNotFoundError(f"附件文件不存在: {attachment_path}")
-                    
-                    # 读取并添加附件
-                    with open(attachment_path, "rb") as f:
-                        attachment = MIMEApplication(f.read())
-                        filename = os.path.basename(attachment_path)
-                        # Use add_header with keyword arguments to handle non-ASCII filenames (RFC 2231)
-                        attachment.add_header(
-                            "Content-Disposition",
-                            "attachment",
-                            filename=filename
-                        )
-                        message.attach(attachment)
+            message, msg_id = self._build_message(sender_email, receiver_email, email_content)
             
             # 连接SMTP服务器并发送邮件
-            if smtp_port == 465:
-                # 使用SSL连接（适用于163, sina等）
-                with smtplib.SMTP_SSL(smtp_server, smtp_port) as server:
-                    server.login(sender_email, sender_password)
-                    server.send_message(message)
-            else:
-                # 使用TLS连接（适用于Gmail, QQ, Outlook等）
-                with smtplib.SMTP(smtp_server, smtp_port) as server:
-                    server.starttls()  # 启用TLS加密
-                    server.login(sender_email, sender_password)
-                    server.send_message(message)
+            with self.open_smtp(sender_email, sender_password, smtp_server, smtp_port) as server:
+                server.send_message(message)
             
+            return self._sent_result(sender_email, receiver_email, email_content, msg_id)
+            
+        except Exception as e:
             return {
-                "success": True,
-                "message": "邮件发送成功",
-                "sender": sender_email,
-                "receiver": receiver_email,
-                "subject": subject,
-                "message_id": msg_id
+                "success": False,
+                "message": f"邮件发送失败: {str(e)}",
+                "error": str(e)
             }
-            
+    
+    def send_email_over(
+        self,
+        server: smtplib.SMTP,
+        sender_email: str,
+        receiver_email: str,
+        email_content: Dict
+    ) -> Dict:
+        """
+        通过已登录的SMTP连接发送邮件（批量发送时复用连接，避免每封邮件重复TLS握手和登录）
+        
+        Args:
+            server: open_smtp() 返回的已登录连接
+            sender_email: 发送方邮箱地址（须与登录账号一致）
+            receiver_email: 接收方邮箱地址
+            email_content: 邮件内容，格式同 send_email()
+        
+        Returns:
+            Dict: 发送结果，格式同 send_email()
+        
+        Raises:
+            smtplib.SMTPServerDisconnected: 连接已断开（调用方可重新连接后重试）
+        """
+        try:
+            if not receiver_email:
+                raise ValueError("接收方邮箱不能为空")
+            message, msg_id = self._build_message(sender_email, receiver_email, email_content)
+            server.send_message(message)
+            return self._sent_result(sender_email, receiver_email, email_content, msg_id)
+        except smtplib.SMTPServerDisconnected:
+            raise
         except Exception as e:
             return {
                 "success": False,
@@ -157,6 +133,96 @@ class EmailService:
                 "error": str(e)
             }
     
+    @staticmethod
+    def open_smtp(
+        sender_email: str,
+        sender_password: str,
+        smtp_server: str,
+        smtp_port: int
+    ) -> smtplib.SMTP:
+        """
+        连接SMTP服务器并登录，返回的连接可用作上下文管理器（退出时发送QUIT）
+        
+        Raises:
+            smtplib.SMTPException / OSError: 连接或登录失败
+        """
+        if smtp_port == 465:
+            # 使用SSL连接（适用于163, sina等）
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port)
+        else:
+            # 使用TLS连接（适用于Gmail, QQ, Outlook等）
+            server = smtplib.SMTP(smtp_server, smtp_port)
+        try:
+            if smtp_port != 465:
+                server.starttls()  # 启用TLS加密
+            server.login(sender_email, sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _build_message(self, sender_email: str, receiver_email: str, email_content: Dict):
+        """构建邮件对象，返回 (message, message_id)"""
+        # 验证邮件内容格式
+        if not isinstance(email_content, dict):
+            raise ValueError("email_content必须是字典格式")
+        
+        subject = email_content.get("subject", "")
+        body = email_content.get("body", "")
+        attachments = email_content.get("attachments", [])
+        
+        # 创建邮件对象
+        message = MIMEMultipart()
+        message["From"] = sender_email
+        message["To"] = receiver_email
+        message["Subject"] = subject
+        
+        # Generate Message-ID
+        msg_id = make_msgid(domain=sender_email.split('@')[-1])
+        message["Message-ID"] = msg_id
+        
+        # 添加邮件正文
+        message.attach(MIMEText(body, "plain", "utf-8"))
+        
+        # 处理附件
+        if attachments:
+            if not isinstance(attachments, list):
+                attachments = [attachments]
+            
+            for attachment_path in attachments:
+                # 验证是否为绝对路径
+                if not self._validate_absolute_path(attachment_path):
+                    raise ValueError(f"附件路径必须是绝对路径: {attachment_path}")
+                
+                # 验证文件是否存在
+                if not os.path.exists(attachment_path):
+                    raise FileNotFoundError(f"附件文件不存在: {attachment_path}")
+                
+                # 读取并添加附件
+                with open(attachment_path, "rb") as f:
+                    attachment = MIMEApplication(f.read())
+                    filename = os.path.basename(attachment_path)
+                    # Use add_header with keyword arguments to handle non-ASCII filenames (RFC 2231)
+                    attachment.add_header(
+                        "Content-Disposition",
+                        "attachment",
+                        filename=filename
+                    )
+                    message.attach(attachment)
+        
+        return message, msg_id
+    
+    @staticmethod
+    def _sent_result(sender_email: str, receiver_email: str, email_content: Dict, msg_id: str) -> Dict:
+        return {
+            "success": True,
+            "message": "邮件发送成功",
+            "sender": sender_email,
+            "receiver": receiver_email,
+            "subject": email_content.get("subject", ""),
+            "message_id": msg_id
+        }
+    
     def fetch_email(
         self,
         email_address: str,
@@ -364,6 +430,30 @@ def send_email(
     )
 
 
+def open_smtp(
+    sender_email: str,
+    sender_password: str,
+    smtp_server: str = "smtp.gmail.com",
+    smtp_port: int = 587
+) -> smtplib.SMTP:
+    """
+    连接SMTP服务器并登录的便捷函数（配合 send_email_over 复用连接批量发送）
+    """
+    return EmailService.open_smtp(sender_email, sender_password, smtp_server, smtp_port)
+
+
+def send_email_over(
+    server: smtplib.SMTP,
+    sender_email: str,
+    receiver_email: str,
+    email_content: Dict
+) -> Dict:
+    """
+    通过已登录的SMTP连接发送邮件的便捷函数
+    """
+    return _email_service.send_email_over(server, sender_email, receiver_email, email_content)
+
+
 def fetch_email(
     email_address: str,
     email_password: str,
@@ -1,4 +1,7 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 import os
 import yaml
@@ -12,6 +15,11 @@ _LOG_CONFIG = {
     "initialized": False
 }
 
+# Shared per-process queue handler; records are written to stdout by a listener thread
+_QUEUE_HANDLER = None
+_STREAM_HANDLER = None
+_LISTENER = None
+
 def load_config():
     config_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../config.yaml'))
     print(f"Loading logger configuration from: {config_path}")
@@ -47,6 +55,33 @@ def init_logger():
     
     _LOG_CONFIG["initialized"] = True
 
+    # Loggers created before init_logger() share the handler, so update it in place
+    if _STREAM_HANDLER is not None:
+        _STREAM_HANDLER.setLevel(_LOG_CONFIG["level"])
+        if _LOG_CONFIG["formatter"]:
+            _STREAM_HANDLER.setFormatter(_LOG_CONFIG["formatter"])
+
+def _get_queue_handler():
+    """
+    Return the process-wide QueueHandler, starting its QueueListener on first use.
+    Logging calls only enqueue the record; the stdout write happens on the
+    listener thread, so the event loop never blocks on log I/O.
+    """
+    global _QUEUE_HANDLER, _STREAM_HANDLER, _LISTENER
+    if _QUEUE_HANDLER is None:
+        _STREAM_HANDLER = logging.StreamHandler(sys.stdout)
+        _STREAM_HANDLER.setLevel(_LOG_CONFIG["level"])
+        if _LOG_CONFIG["formatter"]:
+            _STREAM_HANDLER.setFormatter(_LOG_CONFIG["formatter"])
+
+        log_queue = queue.SimpleQueue()
+        _QUEUE_HANDLER = logging.handlers.QueueHandler(log_queue)
+        _LISTENER = logging.handlers.QueueListener(log_queue, _STREAM_HANDLER, respect_handler_level=True)
+        _LISTENER.start()
+        # Flush remaining records on interpreter exit
+        atexit.register(_LISTENER.stop)
+    return _QUEUE_HANDLER
+
 def get_logger(name: str):
     """
     Get a configured logger instance.
@@ -63,14 +98,7 @@ def get_logger(name: str):
             return logger
 
         logger.setLevel(_LOG_CONFIG["level"])
-        
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(_LOG_CONFIG["level"])
-        
-        if _LOG_CONFIG["formatter"]:
-            handler.setFormatter(_LOG_CONFIG["formatter"])
-            
-        logger.addHandler(handler)
+        logger.addHandler(_get_queue_handler())
         
         # Prevent propagation to root logger if it's also configured to avoid double logging
         logger.propagate = False
@@ -3,7 +3,7 @@ Storage Module
 Provides unified upload/download interface for both MinIO and local filesystem
 """
 import os
-from typing import Dict, Literal
+from typing import BinaryIO, Dict, Iterator, Literal
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 from minio.error import S3Error
@@ -13,6 +13,9 @@ load_dotenv()
 MINIO_BUCKET = os.getenv('MINIO_BUCKET', 'mailmerge')
 LOCAL_DATA_ROOT = os.getenv('LOCAL_DATA_ROOT', '')
 
+# Chunk size used when streaming stored files to clients
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
 def parse_path(path: str) -> Dict:
     """
@@ -240,6 +243,79 @@ def download(source_path: str, local_file_path: str) -> str:
         raise ValueError(f"Unknown storage type: {parsed['type']}")
 
 
+def open_stream(source_path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Open a stored file and return an iterator over its content in chunks.
+    
+    The file is opened before this function returns, so a missing file raises
+    here instead of in the middle of a response. The underlying file handle or
+    MinIO connection is released once the iterator is exhausted or closed.
+    
+    Args:
+        source_path: Source storage path (must have local:// or minio:// prefix)
+        chunk_size: Maximum number of bytes per chunk
+        
+    Returns:
+        Iterator yielding the file content as bytes
+        
+    Raises:
+        FileNotFoundError: If source file doesn't exist
+        ValueError: If source_path format is invalid
+        RuntimeError: If the file cannot be opened
+    """
+    # Parse source path
+    parsed = parse_path(source_path)
+    
+    if parsed['type'] == 'local':
+        source_abs_path = parsed['abs_path']
+        
+        if not os.path.exists(source_abs_path):
+            raise FileNotFoundError(f"Source file not found: {source_abs_path}")
+        
+        return _iter_local(open(source_abs_path, 'rb'), chunk_size)
+    
+    elif parsed['type'] == 'minio':
+        bucket = parsed['bucket']
+        object_name = parsed['object_name']
+        
+        try:
+            from backend.storage_service.minio_service import get_minio_client
+            client = get_minio_client()
+            response = client.get_object(bucket_name=bucket, object_name=object_name)
+        except S3Error as e:
+            if e.code in ('NoSuchKey', 'NoSuchBucket'):
+                raise FileNotFoundError(f"Source file not found: {source_path}")
+            raise RuntimeError(f"MinIO download failed: {str(e)}")
+        except Exception as e:
+            raise RuntimeError(f"Download failed: {str(e)}")
+        
+        return _iter_minio(response, chunk_size)
+    
+    else:
+        raise ValueError(f"Unknown storage type: {parsed['type']}")
+
+
+def _iter_local(file_obj: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Yield chunks from an open local file, closing it when done."""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def _iter_minio(response, chunk_size: int) -> Iterator[bytes]:
+    """Yield chunks from a MinIO get_object response, releasing the connection when done."""
+    try:
+        yield from response.stream(chunk_size)
+    finally:
+        response.close()
+        response.release_conn()
+
+
 def delete(target_path: str) -> bool:
     """
     Delete a file from storage.
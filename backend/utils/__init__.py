@@ -1,2 +1,2 @@
-from .time_utils import get_utc_now, ensure_utc
+from .time_utils import get_utc_now, ensure_utc, parse_iso_utc
 
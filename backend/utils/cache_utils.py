@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+
+def ttl_cache(ttl: float, maxsize: int = 512):
+    """
+    Memoize a function by its positional arguments for `ttl` seconds (thread-safe).
+    Least recently used entries are evicted beyond `maxsize`.
+    The wrapped function gains cache_invalidate(*args) and cache_clear().
+    NOTE: Cached values are shared between callers and must not be mutated.
+    """
+    def decorator(func):
+        entries = OrderedDict()
+        lock = threading.Lock()
+        # Bumped by cache_invalidate/cache_clear; a miss computed across a bump is not stored
+        generation = [0]
+
+        @wraps(func)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(args)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(args)
+                    return entry[1]
+                started = generation[0]
+
+            # Computed outside the lock; concurrent misses may both call func
+            value = func(*args)
+            with lock:
+                if generation[0] != started:
+                    # Invalidated while computing: the value may predate the change
+                    return value
+                entries[args] = (now + ttl, value)
+                entries.move_to_end(args)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return value
+
+        def cache_invalidate(*args):
+            with lock:
+                generation[0] += 1
+                entries.pop(args, None)
+
+        def cache_clear():
+            with lock:
+                generation[0] += 1
+                entries.clear()
+
+        wrapper.cache_invalidate = cache_invalidate
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
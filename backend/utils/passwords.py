@@ -0,0 +1,32 @@
+import hashlib
+import hmac
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHash
+
+# argon2id: tens of milliseconds per hash, far costlier to brute-force offline than one SHA-256 round
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+_ARGON2_PREFIX = "$argon2"
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with argon2id (CPU-bound; run it in a thread pool from async code)."""
+    return _password_hasher.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against its hash, accepting legacy single-round SHA-256 hashes."""
+    if not hashed_password.startswith(_ARGON2_PREFIX):
+        legacy_hash = hashlib.sha256(plain_password.encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, hashed_password)
+    try:
+        return _password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHash):
+        return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True for legacy SHA-256 hashes and argon2 hashes made with outdated parameters."""
+    if not hashed_password.startswith(_ARGON2_PREFIX):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
@@ -14,9 +14,18 @@ logger = get_logger(__name__)
 ALLOWED_TYPES = {'TEXT', 'INTEGER', 'FLOAT', 'DATE', 'DATETIME', 'BOOLEAN', 'EMAIL', 'PHONE', 'ID_CARD', 'EMPLOYEE_ID'}
 
 
+# create_template_core 返回的错误码
+ERROR_VALIDATION = "VALIDATION"          # 模板/字段定义不合法（调整定义后可重试）
+ERROR_DUPLICATE_NAME = "DUPLICATE_NAME"  # 模板名称已存在
+ERROR_INTERNAL = "INTERNAL"              # 数据库等内部错误
+
+
 class TemplateCreationError(Exception):
     """模板创建相关异常"""
-    pass
+    
+    def __init__(self, message: str, error_code: str = ERROR_VALIDATION):
+        super().__init__(message)
+        self.error_code = error_code
 
 
 def validate_field_data(field_data: dict) -> tuple[bool, str]:
@@ -133,11 +142,9 @@ def create_template_core(
         {
             "success": True/False,
             "message": str,
-            "data": {"template_id": int} | None
+            "data": {"template_id": int} | None,
+            "error_code": ERROR_VALIDATION | ERROR_DUPLICATE_NAME | ERROR_INTERNAL  # 仅失败时
         }
-        
-    Raises:
-        TemplateCreationError: 创建失败时抛出
     """
     try:
         # 1. 验证模板名称
@@ -154,7 +161,7 @@ def create_template_core(
         ).first()
         
         if existing:
-            raise TemplateCreationError(f"模板名称 '{name}' 已存在")
+            raise TemplateCreationError(f"模板名称 '{name}' 已存在", ERROR_DUPLICATE_NAME)
         
         # 3. 验证字段列表
         if not fields or not isinstance(fields, list):
@@ -210,7 +217,8 @@ def create_template_core(
         return {
             "success": False,
             "message": str(e),
-            "data": None
+            "data": None,
+            "error_code": e.error_code
         }
     
     except Exception as e:
@@ -221,7 +229,8 @@ def create_template_core(
         return {
             "success": False,
             "message": f"创建模板时发生错误：{str(e)}",
-            "data": None
+            "data": None,
+            "error_code": ERROR_INTERNAL
         }
 
 
@@ -276,7 +285,7 @@ def update_template_core(
             ).first()
             
             if existing:
-                raise TemplateCreationError(f"模板名称 '{name}' 已存在")
+                raise TemplateCreationError(f"模板名称 '{name}' 已存在", ERROR_DUPLICATE_NAME)
             
             template.name = name
         
@@ -1,4 +1,5 @@
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
 # Define Beijing Timezone (UTC+8)
 BEIJING_TZ = timezone(timedelta(hours=8), name='Asia/Shanghai')
@@ -21,3 +22,15 @@ def ensure_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=BEIJING_TZ)
     return dt.astimezone(BEIJING_TZ)
+
+def parse_iso_utc(value: str) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 string into a timezone-aware datetime (Beijing Time).
+    Naive values are treated as Beijing time, as in ensure_utc().
+    Returns None if the value is not valid ISO 8601.
+    """
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return ensure_utc(dt)
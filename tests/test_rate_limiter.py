@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.agent_service import rate_limiter
+from backend.agent_service.rate_limiter import AsyncRateLimiter, create_rate_limiter
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record requested sleeps instead of waiting."""
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def _acquire(limiter, n):
+    async def run():
+        for _ in range(n):
+            await limiter.acquire()
+
+    asyncio.run(run())
+
+
+def test_idle_limiter_admits_burst_without_sleeping(sleeps):
+    _acquire(AsyncRateLimiter(0.1, burst=5), 5)
+    assert sleeps == []
+
+
+def test_sub_one_rate_still_admits_first_call(sleeps):
+    _acquire(AsyncRateLimiter(0.25), 1)
+    assert sleeps == []
+
+
+def test_calls_beyond_burst_wait_one_interval(sleeps):
+    _acquire(AsyncRateLimiter(0.5, burst=3), 4)
+    assert len(sleeps) == 1
+    assert sleeps[0] == pytest.approx(2.0, abs=0.05)
+
+
+def test_create_rate_limiter_splits_rate_but_keeps_burst(monkeypatch, sleeps):
+    monkeypatch.setenv("WEB_CONCURRENCY", "9")
+    limiter = create_rate_limiter(2, burst=20)
+    assert limiter._interval == pytest.approx(4.5)
+    _acquire(limiter, 20)
+    assert sleeps == []
+
+
+def test_create_rate_limiter_disabled():
+    assert create_rate_limiter(0) is None
+    assert create_rate_limiter(None) is None
+
+
+def test_real_burst_does_not_block():
+    start = time.monotonic()
+    _acquire(AsyncRateLimiter(0.1, burst=3), 3)
+    assert time.monotonic() - start < 0.5